@@ -0,0 +1,64 @@
+"""
+Chatty stand-in for syncarr_source/index.py used by the benchmark suite.
+
+Reads the same environment variables `scheduler.run_job` sets, fetches the
+library from the configured A/B instances (normally the stub server), then
+prints one log line per item plus SYNCARR_PROGRESS markers, the way a
+debug-level sync run does.
+
+Extra knobs (environment):
+    BENCH_LINES       total log lines to emit (default: library size)
+    BENCH_LINE_BYTES  padding per line (default: 80)
+    BENCH_PROGRESS_EVERY  emit a progress marker every N lines (default: 100)
+"""
+import json
+import os
+import sys
+import urllib.request
+
+LIBRARY_PATHS = {
+    "RADARR": "/api/v3/movie",
+    "SONARR": "/api/v3/series",
+    "LIDARR": "/api/v1/artist",
+}
+
+
+def detect_type():
+    for type_upper in LIBRARY_PATHS:
+        if os.environ.get(f"{type_upper}_A_URL"):
+            return type_upper
+    return None
+
+
+def fetch_library(base_url, key, path):
+    if not base_url:
+        return []
+    req = urllib.request.Request(f"{base_url.rstrip('/')}{path}", headers={"X-Api-Key": key or ""})
+    with urllib.request.urlopen(req, timeout=60) as res:
+        return json.loads(res.read())
+
+
+def main():
+    type_upper = detect_type()
+    items_a, items_b = [], []
+    if type_upper:
+        path = LIBRARY_PATHS[type_upper]
+        items_a = fetch_library(os.environ.get(f"{type_upper}_A_URL"), os.environ.get(f"{type_upper}_A_KEY"), path)
+        items_b = fetch_library(os.environ.get(f"{type_upper}_B_URL"), os.environ.get(f"{type_upper}_B_KEY"), path)
+
+    total = int(os.environ.get("BENCH_LINES") or len(items_a) or 1000)
+    padding = "x" * int(os.environ.get("BENCH_LINE_BYTES", "80"))
+    every = max(1, int(os.environ.get("BENCH_PROGRESS_EVERY", "100")))
+    out = sys.stdout
+
+    out.write(f"Loaded {len(items_a)} items from A and {len(items_b)} items from B\n")
+    for i in range(1, total + 1):
+        out.write(f"DEBUG checking item {i} {padding}\n")
+        if i % every == 0 or i == total:
+            out.write(f"SYNCARR_PROGRESS:{i}/{total}:Comparing\n")
+    out.write("Sync finished\n")
+    out.flush()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,344 @@
+"""
+Reproducible benchmark suite for the job store, scheduler and run pipeline.
+
+Everything runs against a temporary working directory: a throwaway jobs.json,
+a local stub *arr API (benchmarks/stub_arr.py) and a fake chatty index.py
+(benchmarks/fake_index.py), so no real instances or jobs are touched.
+
+Usage (from the repository root):
+    python benchmarks/run_benchmarks.py --output bench.json
+    python benchmarks/run_benchmarks.py --only job_store,output_pump
+
+Results are written as JSON so runs can be diffed across commits.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.stub_arr import start_stub  # noqa: E402
+from utils import config_manager, leases, live_state, run_journal  # noqa: E402
+import scheduler  # noqa: E402
+
+SECTIONS = ["job_store", "scheduler_dispatch", "output_pump", "api"]
+
+
+# ---------- helpers ----------
+
+def summarize(samples):
+    """Latency summary in milliseconds for a list of durations in seconds"""
+    if not samples:
+        return {"n": 0}
+    ms = sorted(s * 1000.0 for s in samples)
+    return {
+        "n": len(ms),
+        "min_ms": round(ms[0], 3),
+        "median_ms": round(statistics.median(ms), 3),
+        "p95_ms": round(ms[min(len(ms) - 1, int(len(ms) * 0.95))], 3),
+        "max_ms": round(ms[-1], 3),
+        "mean_ms": round(statistics.fmean(ms), 3),
+    }
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def make_job(i, stub_a=None, stub_b=None, arr_type="radarr", last_run="Never"):
+    return {
+        "id": str(uuid.UUID(int=i + 1)),
+        "name": f"Bench Job {i}",
+        "type": arr_type,
+        "interval_minutes": 60,
+        "config": {
+            "url_a": stub_a.url if stub_a else f"http://10.0.0.{i % 250}:7878",
+            "key_a": "a" * 32,
+            "url_b": stub_b.url if stub_b else f"http://10.0.1.{i % 250}:7878",
+            "key_b": "b" * 32,
+            "profile_a": "Any",
+            "path_a": "/media/a",
+            "profile_b": "Any",
+            "path_b": "/media/b",
+            "bidirectional": False,
+            "debug_logging": True,
+        },
+        "last_run": last_run,
+        "status": "Idle",
+    }
+
+
+@contextlib.contextmanager
+def isolated_store(workdir):
+    """Point the job store, scheduler and its state files at files inside `workdir`"""
+    saved = (config_manager.JOBS_FILE, config_manager.BACKUP_FILE, scheduler.LOGS_DIR, scheduler.SYNCARR_DIR,
+             run_journal.JOURNAL_FILE, leases.get_lease_db, live_state.get_live_state_db)
+    config_manager.JOBS_FILE = os.path.join(workdir, "jobs.json")
+    config_manager.BACKUP_FILE = os.path.join(workdir, "jobs.json.bak")
+    scheduler.LOGS_DIR = os.path.join(workdir, "logs")
+    scheduler.SYNCARR_DIR = os.path.join(workdir, "syncarr_source")
+    run_journal.JOURNAL_FILE = os.path.join(workdir, "run_journal.json")
+    leases.get_lease_db = lambda: os.path.join(workdir, "leases.db")
+    live_state.get_live_state_db = lambda: os.path.join(workdir, "live_state.db")
+    try:
+        yield
+    finally:
+        (config_manager.JOBS_FILE, config_manager.BACKUP_FILE, scheduler.LOGS_DIR, scheduler.SYNCARR_DIR,
+         run_journal.JOURNAL_FILE, leases.get_lease_db, live_state.get_live_state_db) = saved
+
+
+def git_commit():
+    try:
+        result = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True)
+        return result.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+# ---------- benchmarks ----------
+
+def bench_job_store(args, workdir):
+    results = {}
+    for n in args.sizes:
+        with isolated_store(tempfile.mkdtemp(dir=workdir)):
+            jobs = [make_job(i) for i in range(n)]
+            config_manager.save_jobs(jobs)
+            target = jobs[n // 2]["id"]
+            results[str(n)] = {
+                "file_bytes": os.path.getsize(config_manager.JOBS_FILE),
+                "load": summarize(timed(config_manager.load_jobs, args.repeat)),
+                "save": summarize(timed(lambda: config_manager.save_jobs(jobs), args.repeat)),
+                "update_status": summarize(timed(
+                    lambda: config_manager.update_job_status(target, "Idle", last_run="2024-01-01 00:00:00"),
+                    args.repeat,
+                )),
+            }
+    return results
+
+
+def bench_scheduler_dispatch(args, workdir):
+    """Time one scheduler tick with every job due, up to the last job being started"""
+    results = {}
+    real_run_job = scheduler.run_job
+    for n in args.sizes:
+        with isolated_store(tempfile.mkdtemp(dir=workdir)):
+            config_manager.save_jobs([make_job(i) for i in range(n)])
+            samples, evaluate = [], []
+            for _ in range(args.repeat):
+                started = []
+                lock = threading.Lock()
+
+                def record(job, *args, **kwargs):
+                    with lock:
+                        started.append(time.perf_counter())
+
+                scheduler.run_job = record
+                try:
+                    tick_start = time.perf_counter()
+                    threads = scheduler.scheduler_tick()
+                    for t in threads:
+                        t.join()
+                finally:
+                    scheduler.run_job = real_run_job
+                samples.append(max(started) - tick_start if started else 0.0)
+
+                jobs = config_manager.load_jobs()
+                now = datetime.now()
+                start = time.perf_counter()
+                scheduler.get_due_jobs(jobs, now)
+                evaluate.append(time.perf_counter() - start)
+            results[str(n)] = {"tick_to_last_start": summarize(samples), "due_evaluation": summarize(evaluate)}
+    return results
+
+
+def bench_output_pump(args, workdir):
+    """Run the real run_job against the fake index.py and stub instances"""
+    stub_a = start_stub("radarr", size=args.library_size, latency_ms=args.latency_ms)
+    stub_b = start_stub("radarr", size=args.library_size, latency_ms=args.latency_ms)
+    results = {}
+    try:
+        for lines in args.lines:
+            with isolated_store(tempfile.mkdtemp(dir=workdir)):
+                os.makedirs(scheduler.SYNCARR_DIR)
+                shutil.copy(os.path.join(BENCH_DIR, "fake_index.py"), os.path.join(scheduler.SYNCARR_DIR, "index.py"))
+                job = make_job(0, stub_a, stub_b)
+                config_manager.save_jobs([job])
+
+                os.environ["BENCH_LINES"] = str(lines)
+                try:
+                    runs = []
+                    for _ in range(args.pump_repeat):
+                        sink = io.StringIO() if args.quiet_console else sys.stderr
+                        start = time.perf_counter()
+                        with contextlib.redirect_stdout(sink):
+                            scheduler.run_job(job)
+                        runs.append(time.perf_counter() - start)
+                finally:
+                    os.environ.pop("BENCH_LINES", None)
+
+                best = min(runs)
+                results[str(lines)] = {
+                    "wall": summarize(runs),
+                    "lines_per_sec_best": round(lines / best, 1) if best else None,
+                    "final_status": config_manager.load_jobs()[0].get("status"),
+                }
+    finally:
+        results["stub_requests"] = stub_a.request_count + stub_b.request_count
+        stub_a.shutdown()
+        stub_b.shutdown()
+    return results
+
+
+def bench_api(args, workdir):
+    """Latency of GET /api/jobs under N concurrent pollers"""
+    try:
+        import requests
+        import uvicorn
+        import web_app
+        from routers import auth
+    except ImportError as e:
+        return {"skipped": f"missing dependency: {e}"}
+
+    results = {}
+    for n in args.sizes:
+        with isolated_store(tempfile.mkdtemp(dir=workdir)):
+            config_manager.save_jobs([make_job(i) for i in range(n)])
+            port = free_port()
+            server = uvicorn.Server(uvicorn.Config(web_app.app, host="127.0.0.1", port=port, log_level="warning"))
+            thread = threading.Thread(target=server.run, daemon=True)
+            thread.start()
+            while not server.started:
+                time.sleep(0.05)
+
+            token = auth.create_access_token({"sub": "bench"})
+            url = f"http://127.0.0.1:{port}/api/jobs"
+            per_size = {}
+            try:
+                for pollers in args.pollers:
+                    samples, errors = [], []
+                    lock = threading.Lock()
+                    deadline = time.perf_counter() + args.api_seconds
+
+                    def poll():
+                        session = requests.Session()
+                        session.headers["Authorization"] = f"Bearer {token}"
+                        local = []
+                        while time.perf_counter() < deadline:
+                            start = time.perf_counter()
+                            try:
+                                res = session.get(url, timeout=30)
+                                res.raise_for_status()
+                                local.append(time.perf_counter() - start)
+                            except Exception as e:
+                                with lock:
+                                    errors.append(str(e))
+                        with lock:
+                            samples.extend(local)
+
+                    workers = [threading.Thread(target=poll) for _ in range(pollers)]
+                    for w in workers:
+                        w.start()
+                    for w in workers:
+                        w.join()
+                    per_size[str(pollers)] = {
+                        "latency": summarize(samples),
+                        "requests_per_sec": round(len(samples) / args.api_seconds, 1),
+                        "errors": len(errors),
+                    }
+            finally:
+                server.should_exit = True
+                thread.join(timeout=10)
+            results[str(n)] = per_size
+    return results
+
+
+BENCHMARKS = {
+    "job_store": bench_job_store,
+    "scheduler_dispatch": bench_scheduler_dispatch,
+    "output_pump": bench_output_pump,
+    "api": bench_api,
+}
+
+
+def int_list(value):
+    return [int(v) for v in value.split(",") if v]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Syncarr GUI benchmark suite")
+    parser.add_argument("--only", default=",".join(SECTIONS), help=f"Comma separated subset of: {', '.join(SECTIONS)}")
+    parser.add_argument("--sizes", type=int_list, default=[10, 100, 1000], help="Job counts for store/dispatch/api")
+    parser.add_argument("--repeat", type=int, default=20, help="Samples per store/dispatch measurement")
+    parser.add_argument("--lines", type=int_list, default=[10000, 100000], help="Lines emitted by the fake index.py")
+    parser.add_argument("--pump-repeat", type=int, default=3)
+    parser.add_argument("--library-size", type=int, default=1000, help="Items served by each stub instance")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Artificial stub latency per request")
+    parser.add_argument("--pollers", type=int_list, default=[1, 10, 50], help="Concurrent /api/jobs pollers")
+    parser.add_argument("--api-seconds", type=float, default=5.0, help="Polling duration per concurrency level")
+    parser.add_argument("--quiet-console", action="store_true", help="Discard run_job console echo instead of sending it to stderr")
+    parser.add_argument("--output", help="Write JSON results to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    selected = [s for s in args.only.split(",") if s]
+    unknown = [s for s in selected if s not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: v for k, v in vars(args).items() if k != "output"},
+        },
+        "results": {},
+    }
+
+    workdir = tempfile.mkdtemp(prefix="syncarr_bench_")
+    try:
+        for name in selected:
+            print(f"Running {name}...", file=sys.stderr)
+            report["results"][name] = BENCHMARKS[name](args, workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
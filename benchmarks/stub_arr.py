@@ -0,0 +1,151 @@
+"""
+Minimal fake Radarr/Sonarr/Lidarr API used by the benchmark suite.
+
+Serves a synthetic library of configurable size with an optional artificial
+latency per request, so sync runs can be benchmarked without real instances.
+
+Standalone usage:
+    python benchmarks/stub_arr.py --type radarr --size 5000 --latency-ms 20 --port 7878
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+API_VERSIONS = {"radarr": "v3", "sonarr": "v3", "lidarr": "v1"}
+LIBRARY_ENDPOINTS = {"radarr": "movie", "sonarr": "series", "lidarr": "artist"}
+
+
+def build_library(arr_type, size):
+    """Generate `size` fake library items shaped roughly like the real API"""
+    items = []
+    for i in range(1, size + 1):
+        item = {
+            "id": i,
+            "title": f"{arr_type.title()} Item {i}",
+            "monitored": True,
+            "qualityProfileId": 1,
+            "rootFolderPath": f"/media/{arr_type}",
+            "path": f"/media/{arr_type}/item-{i}",
+            "tags": [],
+        }
+        if arr_type == "radarr":
+            item["tmdbId"] = 100000 + i
+            item["hasFile"] = i % 3 != 0
+        elif arr_type == "sonarr":
+            item["tvdbId"] = 200000 + i
+        else:
+            item["foreignArtistId"] = f"mbid-{i:08d}"
+        items.append(item)
+    return items
+
+
+class StubArrServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, arr_type="radarr", size=100, latency_ms=0):
+        super().__init__(address, StubArrHandler)
+        self.arr_type = arr_type
+        self.latency = latency_ms / 1000.0
+        self.api_prefix = f"/api/{API_VERSIONS[arr_type]}"
+        self.library_body = json.dumps(build_library(arr_type, size)).encode()
+        self.request_count = 0
+        self._count_lock = threading.Lock()
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count_request(self):
+        with self._count_lock:
+            self.request_count += 1
+
+    def start_background(self):
+        t = threading.Thread(target=self.serve_forever, daemon=True)
+        t.start()
+        return t
+
+
+class StubArrHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def _send_json(self, body, status=200):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _route(self):
+        server = self.server
+        server.count_request()
+        if server.latency:
+            time.sleep(server.latency)
+
+        path = urlparse(self.path).path.rstrip("/")
+        prefix = server.api_prefix
+        if not path.startswith(prefix):
+            return self._send_json({"message": "NotFound"}, 404)
+        resource = path[len(prefix) + 1:]
+
+        if resource == "system/status":
+            return self._send_json({"appName": server.arr_type.title(), "version": "0.0.0-stub"})
+        if resource == LIBRARY_ENDPOINTS[server.arr_type]:
+            if self.command == "GET":
+                return self._send_json(server.library_body)
+            return self._send_json({"id": 0}, 201)
+        if resource == "qualityprofile":
+            return self._send_json([{"id": 1, "name": "Any"}, {"id": 2, "name": "HD-1080p"}])
+        if resource == "rootfolder":
+            return self._send_json([{"id": 1, "path": f"/media/{server.arr_type}"}])
+        if resource in ("tag", "languageprofile", "metadataprofile"):
+            return self._send_json([])
+        return self._send_json({"message": "NotFound"}, 404)
+
+    def _drain_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+    def do_GET(self):
+        self._route()
+
+    def do_POST(self):
+        self._drain_body()
+        self._route()
+
+    def do_PUT(self):
+        self._drain_body()
+        self._route()
+
+
+def start_stub(arr_type="radarr", size=100, latency_ms=0, host="127.0.0.1", port=0):
+    """Start a stub server in a background thread and return it"""
+    server = StubArrServer((host, port), arr_type=arr_type, size=size, latency_ms=latency_ms)
+    server.start_background()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fake *arr API for benchmarking")
+    parser.add_argument("--type", choices=sorted(API_VERSIONS), default="radarr")
+    parser.add_argument("--size", type=int, default=1000, help="Library size")
+    parser.add_argument("--latency-ms", type=float, default=0, help="Added latency per request")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7878)
+    args = parser.parse_args()
+
+    server = StubArrServer((args.host, args.port), arr_type=args.type, size=args.size, latency_ms=args.latency_ms)
+    print(f"Stub {args.type} serving {args.size} items on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
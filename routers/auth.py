@@ -6,6 +6,7 @@ from typing import Optional
 import os
 import json
 import jwt
+from utils import profiling
 
 router = APIRouter()
 
@@ -60,7 +61,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        with profiling.span("auth.jwt"):
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             raise credentials_exception
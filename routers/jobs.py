@@ -1,4 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 from typing import List, Dict, Optional, Any
 import json
@@ -33,17 +34,129 @@ class Job(BaseModel):
     config: Dict[str, Any] # Store raw ENV vars mapping or structured config
     last_run: Optional[str] = "Never"
     status: Optional[str] = "Idle" # Idle, Running, Error
-
-from utils.config_manager import load_jobs, save_jobs
-
-
-@router.get("/api/jobs", response_model=List[Job])
-async def get_jobs(current_user: dict = Depends(get_current_user)):
-    return load_jobs()
+    cron: Optional[str] = None # 5-field cron expression; overrides interval_minutes when set
+    stagger: Optional[bool] = False # Spread interval runs of jobs sharing a host across the interval
+    adaptive: Optional[bool] = False # Adjust the interval from observed change rate
+    min_interval_minutes: Optional[int] = None # Adaptive bounds (default: interval_minutes)
+    max_interval_minutes: Optional[int] = None # (default: 8x interval_minutes)
+    effective_interval_minutes: Optional[int] = None # Interval chosen by adaptive scheduling (read-only)
+    retry: Optional[Dict[str, Any]] = None # Retry policy overrides, see utils.retry.DEFAULT_RETRY_POLICY
+    catch_up: Optional[str] = None # skip, once or spread missed runs after a restart (default: GUI setting)
+    resources: Optional[Dict[str, Any]] = None # nice / memory_mb / max_open_files for the sync process
+    last_run_resources: Optional[Dict[str, Any]] = None # CPU, peak RSS and I/O of the last run (read-only)
+    # Retry / circuit breaker state (read-only)
+    consecutive_failures: Optional[int] = 0
+    next_retry_at: Optional[str] = None
+    circuit_open_until: Optional[str] = None
+    last_failure: Optional[Dict[str, Any]] = None
+
+# Fields maintained by the scheduler; edits from the UI must not overwrite them
+SERVER_MANAGED_FIELDS = [
+    'effective_interval_minutes', 'consecutive_failures', 'retry_attempt',
+    'next_retry_at', 'circuit_open_until', 'last_failure', 'webhook_token', 'last_run_resources',
+]
+
+from utils.config_manager import load_jobs, load_jobs_snapshot, modify_jobs
+from utils.ipc import get_scheduler
+from utils import live_state, profiling
+from utils.resources import validate_limits
+from utils.retry import DEFAULT_RETRY_POLICY
+from utils.schedule import get_cron, preview_load
+from utils.updater import UpdateError, incremental_update
+
+def validate_job(job: Job):
+    if job.cron:
+        try:
+            get_cron(job.cron)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid cron expression: {e}")
+    else:
+        job.cron = None
+    if job.interval_minutes < 1:
+        raise HTTPException(status_code=400, detail="interval_minutes must be at least 1")
+    if job.min_interval_minutes and job.max_interval_minutes and job.min_interval_minutes > job.max_interval_minutes:
+        raise HTTPException(status_code=400, detail="min_interval_minutes cannot exceed max_interval_minutes")
+    if job.catch_up and job.catch_up not in scheduler.CATCH_UP_POLICIES:
+        raise HTTPException(status_code=400, detail=f"catch_up must be one of: {', '.join(scheduler.CATCH_UP_POLICIES)}")
+    if job.retry:
+        unknown = set(job.retry) - set(DEFAULT_RETRY_POLICY)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown retry settings: {', '.join(sorted(unknown))}")
+    if job.resources:
+        error = validate_limits(job.resources)
+        if error:
+            raise HTTPException(status_code=400, detail=error)
+
+MAX_PAGE_SIZE = 500
+
+# Serialized jobs, reused while a job's stored record is unchanged:
+# {job_id: (stored dict, validated dict, {fields: encoded bytes})}
+_encoded_jobs = {}
+
+def _encode_jobs(jobs, fields):
+    """JSON bytes of each job as the Job model would return it, optionally only `fields`"""
+    cache = {}
+    parts = []
+    for job in jobs:
+        entry = _encoded_jobs.get(job['id'])
+        if entry is None or entry[0] != job:
+            entry = (job, Job(**job).dict(), {})
+        elif entry[0] is not job:
+            entry = (job, entry[1], entry[2])  # Same content re-read from disk
+        if fields not in entry[2]:
+            data = entry[1] if fields is None else {f: entry[1].get(f) for f in fields}
+            entry[2][fields] = json.dumps(data).encode()
+        cache[job['id']] = entry
+        parts.append(entry[2][fields])
+    _encoded_jobs.update(cache)
+    return parts
+
+@router.get("/api/jobs")
+async def get_jobs(status: Optional[str] = None, type: Optional[str] = None, fields: Optional[str] = None,
+                   limit: Optional[int] = None, cursor: Optional[str] = None,
+                   current_user: dict = Depends(get_current_user)):
+    """
+    List jobs. Optional filters: `status` and `type` (comma-separated values),
+    `fields` (comma-separated Job fields to return). With `limit`, jobs are
+    returned in id order, `limit` at a time: pass the X-Next-Cursor response
+    header back as `cursor` for the next page (stable across inserts/deletes).
+    X-Total-Count is the number of jobs matching the filters.
+    """
+    jobs = load_jobs_snapshot()
+    # Forget serialized jobs that were deleted
+    for job_id in set(_encoded_jobs) - {j['id'] for j in jobs}:
+        _encoded_jobs.pop(job_id, None)
+
+    if status:
+        wanted = set(status.split(","))
+        jobs = [j for j in jobs if j.get('status', "Idle") in wanted]
+    if type:
+        wanted = {t.lower() for t in type.split(",")}
+        jobs = [j for j in jobs if j.get('type', "").lower() in wanted]
+
+    selected = None
+    if fields:
+        selected = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = set(selected) - set(Job.__fields__)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    headers = {"X-Total-Count": str(len(jobs))}
+    if limit is not None or cursor:
+        limit = max(1, min(limit or MAX_PAGE_SIZE, MAX_PAGE_SIZE))
+        jobs = sorted(jobs, key=lambda j: j['id'])
+        if cursor:
+            jobs = [j for j in jobs if j['id'] > cursor]
+        if len(jobs) > limit:
+            jobs = jobs[:limit]
+            headers["X-Next-Cursor"] = jobs[-1]['id']
+
+    body = b"[" + b",".join(_encode_jobs(jobs, selected)) + b"]"
+    return Response(content=body, media_type="application/json", headers=headers)
 
 @router.post("/api/jobs")
 async def create_job(job: Job, current_user: dict = Depends(get_current_user)):
-    jobs = load_jobs()
+    validate_job(job)
     if not job.id:
         job.id = str(uuid.uuid4())
     
@@ -60,28 +173,182 @@ async def create_job(job: Job, current_user: dict = Depends(get_current_user)):
     # Let's trust the frontend to send the right keys or we map them in the scheduler.
     # Storing them as semantic keys (url_a) is better for UI.
     
-    jobs.append(job.dict())
-    save_jobs(jobs)
+    # One locked read-modify-write, so status/last_run written meanwhile by a scheduler isn't lost
+    modify_jobs(lambda jobs: jobs.append(job.dict()))
     return job
 
-@router.put("/api/jobs/{job_id}")
-async def update_job(job_id: str, job: Job, current_user: dict = Depends(get_current_user)):
-    jobs = load_jobs()
+def _apply_update(jobs, job_id, job: Job):
+    """Replace a job's editable fields in `jobs`. Returns False if the job doesn't exist."""
     for i, j in enumerate(jobs):
         if j['id'] == job_id:
             job.id = job_id # ensure ID matches
-            jobs[i] = job.dict()
-            save_jobs(jobs)
-            return job
-    raise HTTPException(status_code=404, detail="Job not found")
+            # Merge so server-managed fields (e.g. phase_durations) survive edits from the UI
+            jobs[i] = {**j, **job.dict()}
+            for field in SERVER_MANAGED_FIELDS:
+                jobs[i][field] = j.get(field)
+            return True
+    return False
+
+@router.put("/api/jobs/{job_id}")
+async def update_job(job_id: str, job: Job, current_user: dict = Depends(get_current_user)):
+    validate_job(job)
+
+    def apply(jobs):
+        if not _apply_update(jobs, job_id, job):
+            # Raising inside modify_jobs skips the write, keeping jobs.json.bak intact
+            raise HTTPException(status_code=404, detail="Job not found")
+
+    modify_jobs(apply)
+    return job
 
 @router.delete("/api/jobs/{job_id}")
 async def delete_job(job_id: str, current_user: dict = Depends(get_current_user)):
-    jobs = load_jobs()
-    jobs = [j for j in jobs if j['id'] != job_id]
-    save_jobs(jobs)
+    def apply(jobs):
+        jobs[:] = [j for j in jobs if j['id'] != job_id]
+
+    modify_jobs(apply)
+    live_state.forget_job(job_id)
     return {"status": "success"}
 
+class JobBatch(BaseModel):
+    create: List[Job] = []
+    update: List[Job] = [] # Each must carry the id of an existing job
+    delete: List[str] = []
+
+def _job_error(job: Job):
+    """validate_job's message for an invalid job, or None"""
+    try:
+        validate_job(job)
+    except HTTPException as e:
+        return e.detail
+    return None
+
+@router.post("/api/jobs/batch")
+async def batch_jobs(batch: JobBatch, current_user: dict = Depends(get_current_user)):
+    """
+    Create, update and delete many jobs in one write. Either every change is
+    applied or, if any of them is invalid, none is (400 with per-item errors).
+    """
+    errors = []
+    for op, items in (("create", batch.create), ("update", batch.update)):
+        for index, job in enumerate(items):
+            error = _job_error(job)
+            if error:
+                errors.append({"op": op, "index": index, "id": job.id, "error": error})
+    for index, job in enumerate(batch.update):
+        if not job.id:
+            errors.append({"op": "update", "index": index, "id": None, "error": "id is required"})
+    if errors:
+        raise HTTPException(status_code=400, detail={"errors": errors})
+
+    def apply(jobs):
+        existing = {j['id'] for j in jobs}
+        problems = []
+        for index, job in enumerate(batch.create):
+            if job.id in existing:
+                problems.append({"op": "create", "index": index, "id": job.id, "error": "Job already exists"})
+            job.id = job.id or str(uuid.uuid4())
+            existing.add(job.id)
+            jobs.append(job.dict())
+        for index, job in enumerate(batch.update):
+            if not _apply_update(jobs, job.id, job):
+                problems.append({"op": "update", "index": index, "id": job.id, "error": "Job not found"})
+        for index, job_id in enumerate(batch.delete):
+            if job_id not in existing:
+                problems.append({"op": "delete", "index": index, "id": job_id, "error": "Job not found"})
+        if problems:
+            raise HTTPException(status_code=400, detail={"errors": problems})  # Nothing is written
+        deleted = set(batch.delete)
+        jobs[:] = [j for j in jobs if j['id'] not in deleted]
+
+    modify_jobs(apply)
+    for job_id in batch.delete:
+        live_state.forget_job(job_id)
+    return {
+        "status": "success",
+        "created": [job.id for job in batch.create],
+        "updated": [job.id for job in batch.update],
+        "deleted": batch.delete,
+    }
+
+@router.get("/api/jobs/export")
+async def export_jobs(current_user: dict = Depends(get_current_user)):
+    """All jobs as JSON lines (one job per line), including their API keys"""
+    jobs = load_jobs()
+    return StreamingResponse(
+        (json.dumps(job) + "\n" for job in jobs),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="jobs.jsonl"'},
+    )
+
+# Runtime state that an import must not take from the file
+IMPORT_RESET_FIELDS = SERVER_MANAGED_FIELDS + ['last_run', 'status']
+
+def _reset_runtime_fields(job: Job):
+    for field in IMPORT_RESET_FIELDS:
+        if field in Job.__fields__:
+            setattr(job, field, Job.__fields__[field].default)
+
+@router.post("/api/jobs/import")
+async def import_jobs(request: Request, current_user: dict = Depends(get_current_user)):
+    """
+    Create or update jobs from JSON lines (the export format). Jobs whose id
+    exists are updated like PUT, others are created. Either every line is
+    applied or, if any line is invalid, none is (400 with per-line errors).
+    """
+    parsed = []
+    errors = []
+
+    def parse(line_no, raw):
+        if not raw.strip():
+            return
+        try:
+            job = Job(**json.loads(raw))
+        except Exception as e:
+            errors.append({"line": line_no, "error": str(e)})
+            return
+        error = _job_error(job)
+        if error:
+            errors.append({"line": line_no, "id": job.id, "error": error})
+        else:
+            parsed.append(job)
+
+    # Read the body as a stream so large imports aren't buffered twice
+    buffer = b""
+    line_no = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for raw in lines:
+            line_no += 1
+            parse(line_no, raw)
+    if buffer:
+        parse(line_no + 1, buffer)
+    if errors:
+        raise HTTPException(status_code=400, detail={"errors": errors})
+
+    def apply(jobs):
+        by_id = {j['id']: j for j in jobs}
+        created, updated = [], []
+        for job in parsed:
+            _reset_runtime_fields(job)
+            if job.id in by_id:
+                # Keep the existing job's run state; _apply_update keeps its server-managed fields
+                job.status = by_id[job.id].get('status')
+                job.last_run = by_id[job.id].get('last_run')
+                _apply_update(jobs, job.id, job)
+                updated.append(job.id)
+            else:
+                job.id = job.id or str(uuid.uuid4())
+                record = job.dict()
+                jobs.append(record)
+                by_id[job.id] = record
+                created.append(job.id)
+        return created, updated
+
+    created, updated = modify_jobs(apply)
+    return {"status": "success", "created": created, "updated": updated}
+
 @router.post("/api/jobs/{job_id}/test")
 async def test_connection(job_id: str, current_user: dict = Depends(get_current_user)):
     # Load job to get config
@@ -112,7 +379,8 @@ async def test_connection(job_id: str, current_user: dict = Depends(get_current_
         
     try:
         # Simple verify of Instance A
-        res = requests.get(f"{url}{api_path}", params={"apikey": key}, timeout=30, verify=not skip_ssl)
+        with profiling.span("arr.request"):
+            res = requests.get(f"{url}{api_path}", params={"apikey": key}, timeout=30, verify=not skip_ssl)
         if res.status_code == 200:
             return {"status": "success", "message": "Connection to Instance A successful"}
         else:
@@ -144,7 +412,8 @@ async def test_connection_b(job_id: str, current_user: dict = Depends(get_curren
         api_path = "/api/v1/system/status"
         
     try:
-        res = requests.get(f"{url}{api_path}", params={"apikey": key}, timeout=30, verify=not skip_ssl)
+        with profiling.span("arr.request"):
+            res = requests.get(f"{url}{api_path}", params={"apikey": key}, timeout=30, verify=not skip_ssl)
         if res.status_code == 200:
             return {"status": "success", "message": "Connection to Instance B successful"}
         else:
@@ -179,7 +448,8 @@ async def fetch_profiles(req: FetchProfilesRequest, current_user: dict = Depends
         api_path = "/api/v1/qualityprofile"
         
     try:
-        res = requests.get(f"{url}{api_path}", params={"apikey": key}, timeout=30, verify=not skip_ssl)
+        with profiling.span("arr.request"):
+            res = requests.get(f"{url}{api_path}", params={"apikey": key}, timeout=30, verify=not skip_ssl)
         if res.status_code == 200:
             profiles = res.json()
             profile_names = [p.get('name') for p in profiles]
@@ -209,7 +479,8 @@ async def fetch_rootfolders(req: FetchProfilesRequest, current_user: dict = Depe
         api_path = "/api/v1/rootfolder"
         
     try:
-        res = requests.get(f"{url}{api_path}", params={"apikey": key}, timeout=30, verify=not skip_ssl)
+        with profiling.span("arr.request"):
+            res = requests.get(f"{url}{api_path}", params={"apikey": key}, timeout=30, verify=not skip_ssl)
         if res.status_code == 200:
             folders = res.json()
             folder_paths = [f.get('path') for f in folders]
@@ -220,35 +491,47 @@ async def fetch_rootfolders(req: FetchProfilesRequest, current_user: dict = Depe
         return {"status": "error", "folders": [], "message": str(e)}
 
 @router.get("/api/jobs/{job_id}/logs")
-async def get_job_logs(job_id: str, current_user: dict = Depends(get_current_user)):
-    logs = scheduler.get_job_logs(job_id)
-    return {"logs": logs}
+async def get_job_logs(job_id: str, since: Optional[int] = None, current_user: dict = Depends(get_current_user)):
+    """
+    Log lines of the current (or last) run. Pass the returned `cursor` back as
+    `since` to get only new lines; `reset` says the lines replace earlier ones.
+    """
+    result = live_state.read_logs(job_id, since)
+    return {"logs": result['lines'], "cursor": result['cursor'], "reset": result['reset']}
 
 @router.get("/api/jobs/{job_id}/progress")
 async def get_job_progress(job_id: str, current_user: dict = Depends(get_current_user)):
-    progress = scheduler.get_job_progress(job_id)
+    """Live (or last finished) progress: percent, items/s, ETA and per-phase timings"""
+    progress = live_state.get_progress(job_id)
     if progress:
         return {"has_progress": True, **progress}
     return {"has_progress": False}
 
+@router.get("/api/schedule/preview")
+async def schedule_preview(hours: int = 24, current_user: dict = Depends(get_current_user)):
+    """Projected number of concurrently running jobs per minute, overall and per host"""
+    hours = max(1, min(hours, 24 * 7))
+    return preview_load(load_jobs(), datetime.now(), hours=hours)
+
+# Sync handlers: with an external scheduler these calls are blocking IPC round-trips,
+# which must run in the threadpool rather than on the event loop
 @router.post("/api/jobs/{job_id}/run")
-async def run_job_endpoint(job_id: str, current_user: dict = Depends(get_current_user)):
-    jobs = scheduler.load_jobs()
-    job = next((j for j in jobs if j['id'] == job_id), None)
-    if not job:
+def run_job_endpoint(job_id: str, current_user: dict = Depends(get_current_user)):
+    # Runs in the background, in this process or the external scheduler worker
+    if not get_scheduler().start_job(job_id):
         raise HTTPException(status_code=404, detail="Job not found")
     
-    # Run in background via scheduler logic?
-    # Or start thread directly?
-    # Scheduler's run_job is a standalone function.
-    threading.Thread(target=scheduler.run_job, args=(job,)).start()
-    
     return {"status": "success", "message": "Job started"}
 
+@router.post("/api/jobs/{job_id}/cancel")
+def cancel_job_endpoint(job_id: str, current_user: dict = Depends(get_current_user)):
+    if not get_scheduler().cancel_job(job_id):
+        raise HTTPException(status_code=409, detail="Job is not running")
+    return {"status": "success", "message": "Job cancelled"}
+
 
 # ============== UPDATE FUNCTIONALITY ==============
 
-import shutil
 import subprocess
 import sys
 
@@ -276,7 +559,7 @@ def get_source_path():
     return None
 
 @router.post("/api/update")
-async def update_syncarr(current_user: dict = Depends(get_current_user)):
+def update_syncarr(current_user: dict = Depends(get_current_user)):
     """Update Syncarr from source directory or git"""
     
     install_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -298,54 +581,23 @@ async def update_syncarr(current_user: dict = Depends(get_current_user)):
         except Exception as e:
             return {"status": "error", "message": f"Git update failed: {str(e)}"}
 
-    # 2. Try copying from known source location (Network Share / Dev environment)
+    # 2. Incremental update from a known source location (Network Share / Dev environment)
     if source_path and os.path.normpath(source_path) != os.path.normpath(install_path):
-        items_to_update = [
-            "syncarr_source",
-            "static",
-            "routers",
-            "scheduler.py",
-            "web_app.py",
-        ]
-        
-        updated_items = []
-        errors = []
-        
         try:
-            for item in items_to_update:
-                src = os.path.join(source_path, item)
-                dst = os.path.join(install_path, item)
-                
-                if os.path.exists(src):
-                    try:
-                        if os.path.isdir(src):
-                            if os.path.exists(dst):
-                                shutil.rmtree(dst)
-                            shutil.copytree(src, dst)
-                        else:
-                            shutil.copy2(src, dst)
-                        updated_items.append(item)
-                    except Exception as e:
-                        errors.append(f"{item}: {str(e)}")
-            
-            if errors:
-                return {
-                    "status": "partial",
-                    "message": f"Updated {len(updated_items)} items with {len(errors)} errors",
-                    "updated": updated_items,
-                    "errors": errors,
-                    "restart_required": True
-                }
-            
-            return {
-                "status": "success",
-                "message": f"Updated {len(updated_items)} items. Restart the service to apply changes.",
-                "updated": updated_items,
-                "restart_required": True
-            }
-            
-        except Exception as e:
+            result = incremental_update(source_path, install_path)
+        except UpdateError as e:
             return {"status": "error", "message": str(e)}
+        except Exception as e:
+            return {"status": "error", "message": f"Update failed and was rolled back: {e}"}
+
+        if not result['changed'] and not result['removed']:
+            return {"status": "success", "message": "Already up to date.", "restart_required": False, **result}
+        return {
+            "status": "success",
+            "message": f"Updated {len(result['changed'])} files, removed {len(result['removed'])}. Restart the service to apply changes.",
+            "restart_required": True,
+            **result,
+        }
 
     # 3. Fallback: No source found
     return {
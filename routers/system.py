@@ -1,9 +1,14 @@
-from fastapi import APIRouter, WebSocket, Depends
+from fastapi import APIRouter, WebSocket, Depends, HTTPException
+from fastapi.responses import Response
 from fastapi.websockets import WebSocketDisconnect
 from .auth import get_current_user
 import asyncio
+import base64
 import subprocess
 import os
+from utils import leases, profiling
+from utils.config_manager import load_jobs
+from utils.ipc import RemoteScheduler, get_scheduler, scheduler_mode
 
 router = APIRouter()
 
@@ -62,3 +67,80 @@ async def run_sync_trigger(current_user: dict = Depends(get_current_user)):
     # For this specific task "executed the command ... and captures the output",
     # the websocket approach is better for "Log Viewer".
     return {"message": "Use the WebSocket connection to run and view logs."}
+
+@router.get("/api/cluster")
+async def cluster_status(current_user: dict = Depends(get_current_user)):
+    """Scheduler nodes sharing this job store and which node owns which run"""
+    names = {j['id']: j.get('name') for j in load_jobs()}
+    runs = leases.list_leases()
+    for run in runs:
+        run['job_name'] = names.get(run['job_id'])
+    return {
+        "node_id": leases.get_node_id(),
+        "nodes": leases.list_nodes(),
+        "leases": runs,
+    }
+
+@router.get("/api/resources")
+async def resource_usage(current_user: dict = Depends(get_current_user)):
+    """Resource usage of each job's last run, heaviest CPU users first"""
+    usage = [{
+        "id": j['id'],
+        "name": j.get('name'),
+        "limits": j.get('resources') or {},
+        **(j.get('last_run_resources') or {}),
+    } for j in load_jobs() if j.get('last_run_resources')]
+    usage.sort(key=lambda u: u['cpu_user_seconds'] + u['cpu_system_seconds'], reverse=True)
+    return {"jobs": usage}
+
+@router.get("/api/arr-proxy")
+def arr_proxy_stats(current_user: dict = Depends(get_current_user)):
+    """Request counts, cache hits, throttling and latencies per *arr instance behind the proxy"""
+    return get_scheduler().get_proxy_stats()
+
+def _require_profiling():
+    if not profiling.enabled():
+        raise HTTPException(status_code=404, detail='Profiling is disabled; set "profiling": true in gui_config.json and restart')
+
+@router.get("/api/profiling")
+def profiling_stats(reset: bool = False, current_user: dict = Depends(get_current_user)):
+    """
+    Per-route latency histograms and span totals (job store, lock waits, *arr
+    calls) of the API and scheduler. `reset` clears both after reading.
+    """
+    _require_profiling()
+    stats = {"api": profiling.snapshot(reset)}
+    sched = get_scheduler()
+    # An embedded scheduler shares the API process and its numbers; a remote one is reached over blocking IPC
+    stats["scheduler"] = sched.get_profiling_stats(reset) if isinstance(sched, RemoteScheduler) else None
+    return stats
+
+@router.get("/api/profiling/profile")
+def capture_profile(seconds: float = 10, interval_ms: int = profiling.DEFAULT_INTERVAL_MS, format: str = "collapsed",
+                    process: str = "api", current_user: dict = Depends(get_current_user)):
+    """
+    Sample every thread's stack for `seconds` and return collapsed stacks
+    (text, for flame graphs) or a pstats file. `process=scheduler` profiles the
+    scheduler process when it runs separately (same process otherwise).
+    """
+    _require_profiling()
+    if format not in ("collapsed", "pstats"):
+        raise HTTPException(status_code=400, detail="format must be 'collapsed' or 'pstats'")
+    if process not in ("api", "scheduler"):
+        raise HTTPException(status_code=400, detail="process must be 'api' or 'scheduler'")
+    if not 0 < seconds <= profiling.MAX_PROFILE_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds must be between 0 and {profiling.MAX_PROFILE_SECONDS}")
+    target = get_scheduler() if process == "scheduler" else profiling
+    try:
+        result = target.capture_profile(seconds, interval_ms, format)
+    except profiling.ProfilerBusy as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if format == "pstats":
+        return Response(base64.b64decode(result), media_type="application/octet-stream",
+                        headers={"Content-Disposition": f'attachment; filename="syncarr-{process}.pstats"'})
+    return Response(result, media_type="text/plain; charset=utf-8")
+
+@router.get("/api/scheduler")
+def scheduler_status(current_user: dict = Depends(get_current_user)):
+    """Where the scheduler runs and what it is doing"""
+    return {"mode": scheduler_mode(), **get_scheduler().get_status()}
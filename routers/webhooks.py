@@ -0,0 +1,84 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+import base64
+import secrets
+from .auth import get_current_user
+from utils.config_manager import load_jobs, update_job_fields
+from utils.ipc import get_scheduler
+from utils.webhooks import parse_arr_webhook, token_matches
+
+router = APIRouter()
+
+
+def _request_token(request: Request, token: Optional[str]):
+    """
+    The *arr webhook settings can only send a URL and optional username/password,
+    so the job's webhook token is accepted as ?token=, an X-Webhook-Token header,
+    or the password of HTTP Basic auth.
+    """
+    if token:
+        return token
+    header = request.headers.get("X-Webhook-Token")
+    if header:
+        return header
+    auth = request.headers.get("Authorization", "")
+    if auth.lower().startswith("basic "):
+        try:
+            decoded = base64.b64decode(auth[6:]).decode("utf-8")
+            return decoded.split(":", 1)[1] if ":" in decoded else decoded
+        except Exception:
+            return None
+    return None
+
+
+@router.post("/api/webhooks/{job_id}")
+async def receive_webhook(job_id: str, request: Request, token: Optional[str] = None, instance: str = "a"):
+    """Receive a Radarr/Sonarr/Lidarr webhook and queue a debounced targeted sync"""
+    job = next((j for j in load_jobs() if j['id'] == job_id), None)
+    expected = job.get('webhook_token') if job else None
+    provided = _request_token(request, token)
+    # Same response for unknown jobs and bad tokens so job ids can't be probed
+    if not token_matches(expected, provided):
+        raise HTTPException(status_code=401, detail="Invalid webhook token")
+
+    source = instance.upper()
+    if source not in ("A", "B"):
+        raise HTTPException(status_code=400, detail="instance must be 'a' or 'b'")
+
+    try:
+        payload = await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid JSON payload")
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Invalid webhook payload")
+
+    event_type, items = parse_arr_webhook(job['type'], payload)
+    if not items:
+        return {"status": "ignored", "event": event_type}
+
+    # Blocking IPC with an external scheduler; keep it off the event loop
+    pending = await run_in_threadpool(get_scheduler().queue_webhook_events, job_id, source, items)
+    return {"status": "queued", "event": event_type, "items": len(items), "pending": pending}
+
+
+@router.post("/api/jobs/{job_id}/webhook-token")
+async def create_webhook_token(job_id: str, request: Request, current_user: dict = Depends(get_current_user)):
+    """Generate (or rotate) the token *arr instances use to call this job's webhook"""
+    new_token = secrets.token_urlsafe(24)
+    if not update_job_fields(job_id, webhook_token=new_token):
+        raise HTTPException(status_code=404, detail="Job not found")
+    base = str(request.base_url).rstrip("/")
+    return {
+        "status": "success",
+        "token": new_token,
+        "url": f"{base}/api/webhooks/{job_id}?token={new_token}",
+    }
+
+
+@router.delete("/api/jobs/{job_id}/webhook-token")
+async def delete_webhook_token(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Disable the webhook for a job"""
+    if not update_job_fields(job_id, webhook_token=None):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {"status": "success"}
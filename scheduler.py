@@ -9,21 +9,47 @@ from datetime import datetime, timedelta
 JOBS_FILE = "jobs.json"
 POLL_INTERVAL = 30 # Check every 30 seconds
 LOGS_DIR = "logs"
+SYNCARR_DIR = "syncarr_source"
 MAX_LOGS_PER_TYPE = 5
+JOURNAL_PROGRESS_INTERVAL = 5 # Seconds between progress snapshots in the run journal
+RESTORED_LOG_LINES = 500 # Log lines restored from an interrupted run's log file
+MAX_MEMORY_LOG_LINES = 5000 # Log lines of a run kept in job_logs (all of them go to the log file)
+CATCH_UP_POLICIES = ("skip", "once", "spread")
+DEFAULT_CATCH_UP_POLICY = "spread"
+DEFAULT_CATCH_UP_SPREAD_MINUTES = 15
 
 running_jobs = {} # track running processes if needed, or just lock
+active_runs = set() # Jobs being run by this process (from lease claim until release)
+active_runs_lock = threading.Lock()
+cancelled_runs = set() # Runs stopped on request; not treated as failures
 
-from utils.config_manager import load_jobs, save_jobs, update_job_status
+from utils import leases, profiling
+from utils.arr_proxy import DEFAULT_BURST, DEFAULT_CACHE_SECONDS, DEFAULT_RATE, ArrProxy
+from utils.config_manager import get_gui_setting, load_jobs, save_jobs, update_job_status, update_job_fields
+from utils.live_state import LivePublisher
+from utils.output_pump import MARKER_PREFIX, LineClock, read_line_batches
+from utils.progress_tracker import ProgressTracker
+from utils.resources import apply_limits, describe_usage, effective_limits, popen_kwargs, wait_with_usage
+from utils.retry import circuit_open, classify_failure, record_failure, retry_due, success_fields
+from utils.run_journal import kill_orphan, load_journal, read_log_tail, record_run, remove_run
+from utils.schedule import (CHANGES_MARKER, adapt_interval, changes_from_phases, compute_stagger_offsets,
+                            is_item_action, next_run_time, parse_changes)
+from utils.webhooks import MAX_TARGETED_ITEMS, WebhookBatcher, supports_targeted_runs
 
 
 job_logs = {} # In-memory log buffer: {job_id: [lines]}
-job_progress = {}  # In-memory progress tracker: {job_id: {current, total, phase, percent}}
+job_progress = {}  # In-memory progress trackers: {job_id: ProgressTracker} (kept after the run finishes)
+# Both are also published to utils.live_state, which is what the API (possibly other processes) reads
+not_before = {}  # Catch-up holds after a restart: {job_id: datetime}
+arr_proxy = None  # Shared ArrProxy, see get_arr_proxy()
+arr_proxy_lock = threading.Lock()
 
 def get_job_logs(job_id):
     return job_logs.get(job_id, [])
 
 def get_job_progress(job_id):
-    return job_progress.get(job_id, None)
+    tracker = job_progress.get(job_id)
+    return tracker.snapshot() if tracker else None
 
 def ensure_logs_dir():
     """Create logs directory if it doesn't exist"""
@@ -44,8 +70,49 @@ def cleanup_old_logs(job_type):
         except:
             pass
 
-def run_job(job):
-    print(f"Starting job: {job['name']}")
+def run_job(job, targets=None, target_source="A", scheduled=False):
+    """
+    Run one sync of `job`. With `targets` (webhook items from instance
+    `target_source`), the script is asked to sync only those items; targeted
+    runs don't move last_run or feed the adaptive/retry/ETA bookkeeping,
+    which describe full-library runs.
+
+    `scheduled` runs were found due in a possibly stale jobs.json snapshot; once
+    the lease is held the job is re-read and skipped if it has run since.
+
+    Returns False without running if the job is already running here, or
+    another scheduler node holds its lease.
+    """
+    with active_runs_lock:
+        if job['id'] in active_runs:
+            print(f"Job {job['name']} is already running")
+            return False
+        active_runs.add(job['id'])
+    try:
+        if not leases.try_acquire(job['id']):
+            print(f"Job {job['name']} is running on node {leases.live_owner(job['id'])}")
+            return False
+        try:
+            if scheduled:
+                current = next((j for j in load_jobs() if j['id'] == job['id']), None)
+                if current is None or current.get('last_run') != job.get('last_run'):
+                    # Another node finished it between our snapshot and taking the lease
+                    print(f"Job {job['name']} already ran since it was found due; skipping")
+                    return False
+                job = current
+            _execute_run(job, targets, target_source)
+        finally:
+            leases.release(job['id'])
+        return True
+    except Exception as e:
+        print(f"Error running job {job['name']}: {e}")
+        return False
+    finally:
+        with active_runs_lock:
+            active_runs.discard(job['id'])
+
+def _execute_run(job, targets, target_source):
+    print(f"Starting job: {job['name']}" + (f" (targeted, {len(targets)} items)" if targets else ""))
     update_job_status(job['id'], "Running")
     
     # Initialize log buffer for this job
@@ -59,13 +126,25 @@ def run_job(job):
     log_filepath = os.path.join(LOGS_DIR, log_filename)
     log_file = open(log_filepath, 'w', encoding='utf-8')
     
-    # Initialize progress
-    job_progress[job['id']] = {'current': 0, 'total': 0, 'phase': 'Starting', 'percent': 0}
+    # Initialize progress, seeded with previous runs' phase durations for early ETA
+    tracker = ProgressTracker(None if targets else job.get('phase_durations'))
+    job_progress[job['id']] = tracker
+    publisher = LivePublisher(job['id'])
+    publisher.progress(tracker.snapshot(), force=True)
+    success = False
+    run_stats = {'changes': None, 'item_actions': 0}  # Items changed, if the script reports it
+    count_item_actions = bool(job.get('adaptive'))  # Fallback change count, only needed for adaptive jobs
+    journal_state = {'written': time.monotonic()}
+    record_run(job['id'], node_id=leases.get_node_id(), pid=None, started_at=tracker.started_at, log_file=os.path.abspath(log_filepath),
+               targeted=bool(targets), progress=tracker.snapshot())
     
-    def log(msg):
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        
-        # Check for progress markers
+    echo = get_gui_setting("console_job_output", True)
+    console_prefix = f"[Job {job['name']}] "
+    clock = LineClock()
+    lines_buffer = job_logs[job['id']]
+
+    def handle_marker(msg):
+        """Process a SYNCARR_ marker line. Returns True if it should be kept out of the log."""
         if msg.startswith("SYNCARR_PROGRESS:"):
             try:
                 parts = msg.split(":")
@@ -73,29 +152,58 @@ def run_job(job):
                 current = int(numbers[0])
                 total = int(numbers[1])
                 phase = parts[2] if len(parts) > 2 else ""
-                percent = int((current / total) * 100) if total > 0 else 0
-                job_progress[job['id']] = {
-                    'current': current,
-                    'total': total,
-                    'phase': phase,
-                    'percent': percent
-                }
+                tracker.update(current, total, phase)
+                publisher.progress(tracker.snapshot())
+                if time.monotonic() - journal_state['written'] >= JOURNAL_PROGRESS_INTERVAL:
+                    journal_state['written'] = time.monotonic()
+                    record_run(job['id'], progress=tracker.snapshot())
             except:
                 pass
-            return  # Don't log progress markers to the log file
-        
-        line = f"[{timestamp}] {msg}"
-        print(f"[Job {job['name']}] {msg}") # Console
-        job_logs[job['id']].append(line)
+            return True  # Don't log progress markers to the log file
+
+        changes = parse_changes(msg)
+        if changes is not None:
+            run_stats['changes'] = (run_stats['changes'] or 0) + changes
+            return msg.startswith(CHANGES_MARKER)
+        return False
+
+    def log_lines(msgs):
+        """Log a batch of output lines: one timestamp, one console write, one file write"""
+        msgs = [msg for msg in msgs if not (msg.startswith(MARKER_PREFIX) and handle_marker(msg))]
+        if not msgs:
+            return
+        if count_item_actions:
+            run_stats['item_actions'] += sum(1 for msg in msgs if is_item_action(msg))
+        prefix = clock.prefix()
+        lines = [prefix + msg for msg in msgs]
+        if echo:
+            print("\n".join(console_prefix + msg for msg in msgs)) # Console
+        lines_buffer.extend(lines)
+        if len(lines_buffer) > 2 * MAX_MEMORY_LOG_LINES:
+            del lines_buffer[:-MAX_MEMORY_LOG_LINES]
+        publisher.log_many(lines)
         # Write to log file
-        log_file.write(line + "\n")
+        log_file.write("\n".join(lines) + "\n")
         log_file.flush()
 
+    def log(msg):
+        log_lines([msg])
+
+    def fail(category, transient, reason):
+        if targets:
+            update_job_status(job['id'], "Error")
+            return
+        now = datetime.now()
+        fields, message = record_failure(job, category, transient, now, reason)
+        log(message)
+        update_job_fields(job['id'], status="Error", last_run=now.strftime("%Y-%m-%d %H:%M:%S"), **fields)
+
     try:
         # Construct ENV vars for Syncarr script
         env = os.environ.copy()
         env["IS_IN_DOCKER"] = "1"
         env["SYNC_INTERVAL_SECONDS"] = "0" # Run once
+        env["PYTHONIOENCODING"] = "utf-8" # Output is decoded as UTF-8
         
         type_upper = job['type'].upper() # RADARR, SONARR
         
@@ -133,6 +241,13 @@ def run_job(job):
         if url_b and not url_b.startswith("http://") and not url_b.startswith("https://"):
             url_b = "http://" + url_b
 
+        # Route the sync's API traffic through the shared proxy (pooling, rate limits, cache)
+        proxy = get_arr_proxy()
+        if proxy:
+            verify_ssl = not config.get('skip_ssl_verify', False)
+            url_a = proxy.register(url_a, verify_ssl) if url_a else url_a
+            url_b = proxy.register(url_b, verify_ssl) if url_b else url_b
+
         env[f"{type_upper}_A_URL"] = url_a
         env[f"{type_upper}_A_KEY"] = config.get('key_a', '')
         env[f"{type_upper}_A_PROFILE"] = config.get('profile_a', '')
@@ -143,40 +258,84 @@ def run_job(job):
         env[f"{type_upper}_B_PROFILE"] = config.get('profile_b', '')
         env[f"{type_upper}_B_PATH"] = config.get('path_b', '')
         
-        cwd = "syncarr_source"
+        # Targeted sync (webhooks): restrict the run to these items of the source instance
+        if targets:
+            env["SYNCARR_TARGET_SOURCE"] = target_source
+            env["SYNCARR_TARGET_IDS"] = ",".join(str(t['id']) for t in targets)
+            env["SYNCARR_TARGET_EXTERNAL_IDS"] = ",".join(str(t['external_id']) for t in targets if t.get('external_id'))
+            env["SYNCARR_TARGET_DELETED_IDS"] = ",".join(str(t['id']) for t in targets if t.get('deleted'))
+            log(f"Targeted sync from instance {target_source}: " + ", ".join(str(t.get('title') or t['id']) for t in targets))
+        
+        cwd = SYNCARR_DIR
         if not os.path.exists(os.path.join(cwd, "index.py")):
              log("Error: index.py not found")
-             update_job_status(job['id'], "Error")
+             fail('missing_script', False, "index.py not found")
              return
 
+        limits = effective_limits(job, get_gui_setting("resource_limits"))
         process = subprocess.Popen(
             ["python", "index.py"],
             cwd=cwd,
             env=env,
             stdout=subprocess.PIPE,
             stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1
+            bufsize=0, # Read in bulk by read_line_batches
+            **popen_kwargs(limits)
         )
+        started = time.monotonic()
+        running_jobs[job['id']] = process
+        record_run(job['id'], pid=process.pid)
+        if limits:
+            try:
+                unsupported = apply_limits(process.pid, limits)
+                if unsupported:
+                    log(f"Resource limits not supported on this platform: {', '.join(unsupported)}")
+            except Exception as e:
+                log(f"Could not apply resource limits: {e}")
         
-        for line in iter(process.stdout.readline, ''):
-            if line:
-                log(line.strip())
-            else:
-                break
-                
-        process.wait()
+        for batch in read_line_batches(process.stdout):
+            log_lines(batch)
         
-        if process.returncode == 0:
-            log(f"Job completed successfully.")
+        usage = wait_with_usage(process)
+        if usage:
+            wall_seconds = time.monotonic() - started
+            log(f"Resources: {describe_usage(usage, wall_seconds)}")
+            update_job_fields(job['id'], last_run_resources={
+                **usage, 'wall_seconds': round(wall_seconds, 3), 'at': datetime.now().strftime("%Y-%m-%d %H:%M:%S")})
+        
+        if job['id'] in cancelled_runs:
+            log("Job cancelled.")
             update_job_status(job['id'], "Idle", last_run=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+        elif process.returncode == 0:
+            success = True
+            log(f"Job completed successfully.")
+            if targets:
+                update_job_status(job['id'], "Idle")
+                return
+            changes = run_stats['changes']
+            if changes is None:
+                # No explicit marker: fall back to change phases in the progress output, then item action lines
+                changes = changes_from_phases(tracker.phase_items())
+            if changes is None and run_stats['item_actions']:
+                changes = run_stats['item_actions']
+            fields = {'last_changes': changes, **success_fields()}
+            if job.get('adaptive'):
+                fields['effective_interval_minutes'] = adapt_interval(job, changes)
+                if changes is None:
+                    log("Adaptive interval: no change count found in this run's output "
+                        f"(no SYNCARR_CHANGES/SUMMARY marker, change phase or item lines); keeping {fields['effective_interval_minutes']} min")
+                else:
+                    log(f"Adaptive interval: next run in {fields['effective_interval_minutes']} min ({changes} changes)")
+            update_job_fields(job['id'], status="Idle", last_run=datetime.now().strftime("%Y-%m-%d %H:%M:%S"), **fields)
         else:
+            category, transient = classify_failure(process.returncode, job_logs[job['id']])
             log(f"Job failed with exit code {process.returncode}")
-            update_job_status(job['id'], "Error", last_run=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            fail(category, transient, f"exit code {process.returncode}")
 
     except Exception as e:
         log(f"Error running job: {e}")
-        update_job_status(job['id'], "Error")
+        # Failed inside the GUI rather than in the sync script (e.g. could not launch python)
+        fail('internal', True, str(e))
     
     finally:
         # Close log file and cleanup old logs
@@ -185,43 +344,267 @@ def run_job(job):
         except:
             pass
         cleanup_old_logs(job_type)
-        # Clear progress
-        if job['id'] in job_progress:
-            del job_progress[job['id']]
+        running_jobs.pop(job['id'], None)
+        cancelled_runs.discard(job['id'])
+        remove_run(job['id'])
+        # Keep the final progress snapshot; remember phase timings of good runs for future ETAs
+        tracker.finish(success)
+        publisher.flush()
+        publisher.progress(tracker.snapshot(), force=True)
+        if success and tracker.phases and not targets:
+            update_job_fields(job['id'], phase_durations=tracker.merged_phase_history())
+
+def get_due_jobs(jobs, now):
+    """Return the jobs that should be started at `now`"""
+    offsets = compute_stagger_offsets(jobs)
+    due = []
+    for job in jobs:
+        # Check eligibility
+        if job.get('status') == "Running" or circuit_open(job, now):
+            continue
+        hold = not_before.get(job['id'])
+        if hold is not None:
+            if now < hold:
+                continue
+            del not_before[job['id']]
+        if retry_due(job, now):
+            due.append(job)
+            continue
+        try:
+            next_run = next_run_time(job, now, offsets.get(job['id']))
+        except ValueError as e:
+            print(f"Cannot schedule job {job.get('name')}: {e}")
+            continue
+        
+        if now >= next_run:
+            due.append(job)
+    return due
+
+def scheduler_tick():
+    """Start every due job once. Returns the threads that were started."""
+    jobs = load_jobs()
+    now = datetime.now()
+    take_over_orphaned_jobs(jobs, now)
+    
+    threads = []
+    for job in get_due_jobs(jobs, now):
+       t = threading.Thread(target=run_job, args=(job,), kwargs={'scheduled': True})
+       t.start()
+       threads.append(t)
+    return threads
 
 def scheduler_loop():
     print("Scheduler started.")
     while True:
         try:
-            jobs = load_jobs()
-            now = datetime.now()
-            
-            for job in jobs:
-                # Check eligibility
-                last_run_str = job.get('last_run')
-                interval = job.get('interval_minutes', 60)
-                
-                should_run = False
-                if last_run_str == "Never" or not last_run_str:
-                     should_run = True # Auto-run new jobs immediately
-                else:
-                    try:
-                        last_run = datetime.strptime(last_run_str, "%Y-%m-%d %H:%M:%S")
-                        next_run = last_run + timedelta(minutes=int(interval))
-                        if now >= next_run and job.get('status') != "Running":
-                            should_run = True
-                    except ValueError:
-                        pass 
-                
-                if should_run:
-                   t = threading.Thread(target=run_job, args=(job,))
-                   t.start()
-                   
+            with profiling.span("scheduler.tick"):
+                scheduler_tick()
         except Exception as e:
             print(f"Scheduler error: {e}")
             
         time.sleep(POLL_INTERVAL)
 
+def start_job(job_id):
+    """Run a job now in the background. Returns False if the job doesn't exist."""
+    job = next((j for j in load_jobs() if j['id'] == job_id), None)
+    if not job:
+        return False
+    threading.Thread(target=run_job, args=(job,)).start()
+    return True
+
+def cancel_job(job_id):
+    """Stop a job's running sync process. Returns False if it isn't running here."""
+    process = running_jobs.get(job_id)
+    # Don't poll(): the run's own thread reaps the child with os.wait4 to collect its resource usage
+    if process is None or process.returncode is not None:
+        return False
+    cancelled_runs.add(job_id)
+    process.terminate()
+    return True
+
+def get_arr_proxy():
+    """The shared *arr proxy, started on first use when the `arr_proxy` GUI setting is on"""
+    global arr_proxy
+    if not get_gui_setting("arr_proxy", False):
+        return None
+    with arr_proxy_lock:
+        if arr_proxy is None:
+            arr_proxy = ArrProxy(
+                port=int(get_gui_setting("arr_proxy_port", 0)),
+                rate=float(get_gui_setting("arr_proxy_rate", DEFAULT_RATE)),
+                burst=int(get_gui_setting("arr_proxy_burst", DEFAULT_BURST)),
+                cache_seconds=float(get_gui_setting("arr_proxy_cache_seconds", DEFAULT_CACHE_SECONDS)),
+            )
+            print(f"*arr proxy listening on 127.0.0.1:{arr_proxy.port}")
+    return arr_proxy
+
+def get_proxy_stats():
+    """Per-instance request counts and latencies of the *arr proxy"""
+    if arr_proxy is None:
+        return {"enabled": bool(get_gui_setting("arr_proxy", False)), "instances": []}
+    return {"enabled": True, **arr_proxy.stats()}
+
+def get_profiling_stats(reset=False):
+    """Route histograms and span totals of this process (see utils.profiling), optionally clearing them"""
+    return profiling.snapshot(reset)
+
+def capture_profile(seconds, interval_ms, fmt):
+    """Sampling profile of this process; pstats data comes back base64-encoded"""
+    return profiling.capture_profile(seconds, interval_ms, fmt)
+
+def get_status():
+    """Summary of this scheduler process"""
+    with active_runs_lock:
+        active = sorted(active_runs)
+    return {
+        'node_id': leases.get_node_id(),
+        'pid': os.getpid(),
+        'active_runs': active,
+        'pending_webhooks': webhook_batcher.pending(),
+    }
+
+def dispatch_webhook_batch(job_id, source, items):
+    """Start a targeted (or, for big batches, full) run for a debounced webhook batch"""
+    job = next((j for j in load_jobs() if j['id'] == job_id), None)
+    if not job:
+        return True  # Job was deleted; drop the events
+    if job.get('status') == "Running":
+        return False  # Try again once the current run is done
+    targets = items if len(items) <= MAX_TARGETED_ITEMS else None
+    if targets is None:
+        print(f"Webhook batch of {len(items)} items for {job['name']}; running a full sync")
+    elif not supports_targeted_runs(SYNCARR_DIR):
+        # The script would ignore the targets and scan everything; run and account for it as a full sync
+        print(f"Webhook batch of {len(items)} items for {job['name']}; the sync script doesn't support targeted runs, running a full sync")
+        targets = None
+    threading.Thread(target=run_job, args=(job, targets, source)).start()
+    return True
+
+webhook_batcher = WebhookBatcher(dispatch_webhook_batch)
+
+def queue_webhook_events(job_id, source, items):
+    """Queue webhook items for a debounced targeted sync. Returns the pending batch size."""
+    return webhook_batcher.add(job_id, source, items)
+
+def _mark_interrupted(job, now, reason, retry=True):
+    fields = {
+        'status': "Error",
+        'last_failure': {'category': 'interrupted', 'transient': True, 'reason': reason,
+                         'at': now.strftime("%Y-%m-%d %H:%M:%S")},
+    }
+    if retry:
+        fields['next_retry_at'] = now.strftime("%Y-%m-%d %H:%M:%S")
+    update_job_fields(job['id'], **fields)
+    job.update(fields)
+
+def recover_interrupted_runs(jobs, now):
+    """
+    Reconcile jobs left "Running" by a previous process of this node (killed
+    mid-run): kill leftover index.py children, restore their progress and log
+    tail from the run journal, and mark them for an immediate retry. Runs
+    owned by other live nodes, or by another live scheduler process
+    of this node, are left alone. Returns the recovered job ids.
+    """
+    node_id = leases.get_node_id()
+    journal = load_journal()
+    recovered = []
+    for job in jobs:
+        entry = journal.get(job['id'])
+        if entry and entry.get('node_id', node_id) != node_id:
+            continue  # Another node's run (shared install directory)
+        if job.get('status') != "Running" and not entry:
+            continue
+        if leases.held_elsewhere(job['id'], node_id):
+            continue  # Running on another node, or in another live scheduler process on this host
+        entry = entry or {}
+        if kill_orphan(entry.get('pid')):
+            print(f"Killed orphaned sync process {entry.get('pid')} of job {job.get('name')}")
+
+        lines = read_log_tail(entry.get('log_file'), RESTORED_LOG_LINES)
+        lines.append(f"[{now.strftime('%H:%M:%S')}] Run interrupted by a service restart")
+        job_logs[job['id']] = lines
+        job_progress[job['id']] = ProgressTracker.from_snapshot(entry.get('progress') or {}, "Interrupted")
+        LivePublisher(job['id'], lines).progress(job_progress[job['id']].snapshot(), force=True)
+
+        reason = "service restarted during run" if entry else "run owner stopped responding"
+        _mark_interrupted(job, now, reason, retry=not entry.get('targeted'))
+        leases.release(job['id'], node_id, any_process=True)
+        remove_run(job['id'])
+        recovered.append(job['id'])
+    return recovered
+
+def take_over_orphaned_jobs(jobs, now):
+    """
+    Jobs still "Running" whose owner's lease expired belong to a node that
+    died. Claim them and queue an immediate retry so any live node picks them up.
+    """
+    expired = {l['job_id']: l['node_id'] for l in leases.list_leases() if l['expired']}
+    for job in jobs:
+        if job.get('status') != "Running" or job['id'] not in expired or job['id'] in active_runs:
+            continue
+        if not leases.try_acquire(job['id']):
+            continue
+        try:
+            print(f"Taking over job {job.get('name')} from dead node {expired[job['id']]}")
+            _mark_interrupted(job, now, f"node {expired[job['id']]} stopped responding")
+        finally:
+            leases.release(job['id'])
+
+def heartbeat_loop():
+    """Keep this node's leases alive while its jobs run"""
+    while True:
+        try:
+            with active_runs_lock:
+                job_ids = list(active_runs)
+            leases.heartbeat(job_ids)
+        except Exception as e:
+            print(f"Lease heartbeat error: {e}")
+        time.sleep(leases.HEARTBEAT_INTERVAL)
+
+def plan_catch_up(jobs, now):
+    """
+    Decide when overdue jobs (missed runs, never-run jobs, interrupted runs) start
+    after a restart, instead of firing them all at once. Policy comes from the
+    job's `catch_up` or the global `catch_up` GUI setting:
+      skip   - drop the missed run, wait for the next scheduled time
+      once   - run it once straight away
+      spread - run it once, spread over `catch_up_spread_minutes` (most overdue first)
+    """
+    default_policy = get_gui_setting("catch_up", DEFAULT_CATCH_UP_POLICY)
+    window = float(get_gui_setting("catch_up_spread_minutes", DEFAULT_CATCH_UP_SPREAD_MINUTES))
+    offsets = compute_stagger_offsets(jobs)
+
+    to_spread = []
+    for job in get_due_jobs(jobs, now):
+        policy = job.get('catch_up') or default_policy
+        if policy not in CATCH_UP_POLICIES:
+            policy = DEFAULT_CATCH_UP_POLICY
+        if policy == "skip":
+            skipped = dict(job, last_run=now.strftime("%Y-%m-%d %H:%M:%S"))
+            not_before[job['id']] = next_run_time(skipped, now, offsets.get(job['id']))
+        elif policy == "spread":
+            try:
+                overdue_since = next_run_time(job, now, offsets.get(job['id']))
+            except ValueError:
+                overdue_since = now
+            to_spread.append((overdue_since, job))
+
+    to_spread.sort(key=lambda item: item[0])
+    for i, (_, job) in enumerate(to_spread):
+        not_before[job['id']] = now + timedelta(minutes=window * i / len(to_spread))
+    if not_before:
+        print(f"Catch-up: {len(not_before)} overdue job(s) deferred")
+
 def start_scheduler():
+    threading.Thread(target=heartbeat_loop, daemon=True).start()
+    try:
+        jobs = load_jobs()
+        now = datetime.now()
+        recovered = recover_interrupted_runs(jobs, now)
+        if recovered:
+            print(f"Recovered {len(recovered)} interrupted run(s)")
+        plan_catch_up(jobs, now)
+    except Exception as e:
+        print(f"Scheduler recovery error: {e}")
     t = threading.Thread(target=scheduler_loop, daemon=True)
     t.start()
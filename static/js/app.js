@@ -0,0 +1,513 @@
+// Job fields that change while runs are in progress, refreshed by the fast poll
+const POLL_FIELDS = 'id,status,last_run,next_retry_at,circuit_open_until,consecutive_failures,last_failure,effective_interval_minutes';
+
+function app() {
+    return {
+        token: localStorage.getItem('syncarr_token') || null,
+        loginForm: { username: '', password: '' },
+        loginError: '',
+        currentTab: 'jobs',
+        jobs: [],
+        progressInterval: null,
+
+        // Job Modal
+        showJobModal: false,
+        editingJob: null,
+        jobForm: {
+            id: null,
+            name: 'My New Sync',
+            type: 'radarr',
+            interval_minutes: 60,
+            resources: {},
+            config: { url_a: '', key_a: '', url_b: '', key_b: '', profile_b: '', path_b: '', unmonitor_if_downloaded: false }
+        },
+
+        // Settings
+        settingsForm: { username: 'admin', password: '' },
+        portForm: { port: 8000 },
+        settingsStatus: '',
+        settingsSuccess: false,
+
+        // Updates
+        updateStatus: '',
+        updateMessage: '',
+
+        // Logs
+        logs: [],
+        logIdCounter: 0,
+        selectedJobLogId: null,
+        logCursor: null,
+
+        // Fetch data for dropdowns
+        profilesA: [],
+        foldersA: [],
+        profilesB: [],
+        foldersB: [],
+
+        // Computed-like getters for type-specific content
+        get contentLabel() {
+            const labels = { radarr: 'Movies', sonarr: 'Shows', lidarr: 'Artists' };
+            return labels[this.jobForm.type] || 'Content';
+        },
+        get contentLabelSingular() {
+            const labels = { radarr: 'movie', sonarr: 'episode', lidarr: 'album' };
+            return labels[this.jobForm.type] || 'content';
+        },
+        get urlPlaceholder() {
+            const placeholders = {
+                radarr: 'https://radarr.domain.com or http://192.168.1.x:7878',
+                sonarr: 'https://sonarr.domain.com or http://192.168.1.x:8989',
+                lidarr: 'https://lidarr.domain.com or http://192.168.1.x:8686'
+            };
+            return placeholders[this.jobForm.type] || '';
+        },
+        get typeColor() {
+            const colors = { radarr: 'orange', sonarr: 'blue', lidarr: 'green' };
+            return colors[this.jobForm.type] || 'gray';
+        },
+        get typeBgClass() {
+            const classes = {
+                radarr: 'bg-orange-600',
+                sonarr: 'bg-blue-600',
+                lidarr: 'bg-green-600'
+            };
+            return classes[this.jobForm.type] || 'bg-gray-600';
+        },
+
+        init() {
+            if (this.token) {
+                this.fetchJobs();
+                // this.connectLogs(); 
+            }
+        },
+
+        async login() {
+            this.loginError = '';
+            try {
+                const formData = new FormData();
+                formData.append('username', this.loginForm.username);
+                formData.append('password', this.loginForm.password);
+                const res = await fetch('/token', { method: 'POST', body: formData });
+                if (!res.ok) throw new Error('Invalid credentials');
+                const data = await res.json();
+                this.token = data.access_token;
+                localStorage.setItem('syncarr_token', this.token);
+                this.fetchJobs();
+                // this.connectLogs();
+            } catch (e) {
+                this.loginError = e.message;
+            }
+        },
+
+        async viewJobLogs(jobId) {
+            this.currentTab = 'logs';
+            this.selectedJobLogId = jobId;
+            this.logs = [];
+            this.logCursor = null;
+            await this.fetchJobLogs();
+        },
+
+        async fetchJobLogs() {
+            if (!this.selectedJobLogId) return;
+            try {
+                // Only fetch lines added since the last refresh
+                const since = this.logCursor === null ? '' : `?since=${this.logCursor}`;
+                const res = await fetch(`/api/jobs/${this.selectedJobLogId}/logs${since}`, {
+                    headers: { 'Authorization': `Bearer ${this.token}` }
+                });
+                const data = await res.json();
+                const lines = data.logs.map(text => ({ id: this.logIdCounter++, text: text }));
+                this.logs = data.reset ? lines : this.logs.concat(lines);
+                this.logCursor = data.cursor;
+            } catch (e) {
+                this.logs = [{ id: 0, text: "Error fetching logs." }];
+            }
+        },
+
+        async runJob(jobId) {
+            try {
+                const res = await fetch(`/api/jobs/${jobId}/run`, {
+                    method: 'POST',
+                    headers: { 'Authorization': `Bearer ${this.token}` }
+                });
+                if (res.ok) {
+                    alert("Job triggered.");
+                    this.fetchJobs();
+                } else {
+                    alert("Failed to trigger job.");
+                }
+            } catch (e) {
+                alert("Error: " + e.message);
+            }
+        },
+
+        async cancelJob(jobId) {
+            if (!confirm("Cancel this run?")) return;
+            try {
+                const res = await fetch(`/api/jobs/${jobId}/cancel`, {
+                    method: 'POST',
+                    headers: { 'Authorization': `Bearer ${this.token}` }
+                });
+                if (!res.ok) {
+                    const data = await res.json();
+                    alert(data.detail || "Failed to cancel job.");
+                }
+                this.fetchJobs();
+            } catch (e) {
+                alert("Error: " + e.message);
+            }
+        },
+
+        logout() {
+            this.token = null;
+            localStorage.removeItem('syncarr_token');
+            if (this.socket) this.socket.close();
+        },
+
+        async fetchJobs(statusOnly = false) {
+            if (!this.token) return;
+            const url = statusOnly ? `/api/jobs?fields=${POLL_FIELDS}` : '/api/jobs';
+            const res = await fetch(url, { headers: { 'Authorization': `Bearer ${this.token}` } });
+            if (res.status === 401) this.logout();
+            const data = await res.json();
+            if (!statusOnly) {
+                this.jobs = data;
+            } else if (data.length === this.jobs.length && data.every((j, i) => j.id === this.jobs[i].id)) {
+                data.forEach((j, i) => Object.assign(this.jobs[i], j));
+            } else {
+                return this.fetchJobs(); // Jobs were added or removed elsewhere
+            }
+
+            // Fetch progress for running jobs
+            for (let job of this.jobs) {
+                if (job.status === 'Running') {
+                    try {
+                        const progressRes = await fetch(`/api/jobs/${job.id}/progress`, {
+                            headers: { 'Authorization': `Bearer ${this.token}` }
+                        });
+                        const progress = await progressRes.json();
+                        if (progress.has_progress) {
+                            job.progress = progress;
+                        }
+                    } catch (e) { }
+                } else {
+                    job.progress = null;
+                }
+            }
+
+            // If any job is running, poll more frequently
+            const anyRunning = this.jobs.some(j => j.status === 'Running');
+            if (anyRunning && !this.progressInterval) {
+                this.progressInterval = setInterval(() => this.fetchJobs(true), 2000);
+            } else if (!anyRunning && this.progressInterval) {
+                clearInterval(this.progressInterval);
+                this.progressInterval = null;
+            }
+        },
+
+        openJobModal(job = null) {
+            this.editingJob = job;
+            if (job) {
+                this.jobForm = JSON.parse(JSON.stringify(job)); // Deep copy
+                // Ensure config object exists
+                if (!this.jobForm.config) this.jobForm.config = { url_a: '', key_a: '', url_b: '', key_b: '', profile_b: '', path_b: '', profile_a: '', path_a: '', bidirectional: false, debug_logging: false, skip_ssl_verify: false, sync_missing: false };
+                if (!this.jobForm.resources) this.jobForm.resources = {};
+            } else {
+                this.jobForm = {
+                    id: null,
+                    name: 'My New Sync',
+                    type: 'radarr',
+                    interval_minutes: 60,
+                    cron: '',
+                    stagger: false,
+                    adaptive: false,
+                    min_interval_minutes: null,
+                    max_interval_minutes: null,
+                    resources: {},
+                    config: { url_a: '', key_a: '', url_b: '', key_b: '', profile_b: '', path_b: '', profile_a: '', path_a: '', bidirectional: false, debug_logging: false, skip_ssl_verify: false, sync_missing: false, unmonitor_if_downloaded: false }
+                };
+            }
+            this.showJobModal = true;
+        },
+
+        async saveJob() {
+            const url = this.editingJob ? `/api/jobs/${this.jobForm.id}` : '/api/jobs';
+            const method = this.editingJob ? 'PUT' : 'POST';
+            // A cleared number input leaves '' behind; the API expects null for "no bound"
+            const job = { ...this.jobForm };
+            for (const field of ['min_interval_minutes', 'max_interval_minutes']) {
+                if (job[field] === '' || job[field] === undefined) job[field] = null;
+            }
+
+            try {
+                const res = await fetch(url, {
+                    method: method,
+                    headers: { 'Content-Type': 'application/json', 'Authorization': `Bearer ${this.token}` },
+                    body: JSON.stringify(job)
+                });
+                if (!res.ok) throw new Error("Failed to save job");
+                this.showJobModal = false;
+                this.fetchJobs();
+            } catch (e) {
+                alert(e.message);
+            }
+        },
+
+        async deleteJob(id) {
+            if (!confirm("Delete this job?")) return;
+            await fetch(`/api/jobs/${id}`, { method: 'DELETE', headers: { 'Authorization': `Bearer ${this.token}` } });
+            this.fetchJobs();
+        },
+
+        async testConnectionA() {
+            if (!this.editingJob && !this.jobForm.id) {
+                alert("Please save the job first before testing.");
+                return;
+            }
+
+            try {
+                const res = await fetch(`/api/jobs/${this.jobForm.id}/test`, {
+                    method: 'POST',
+                    headers: { 'Authorization': `Bearer ${this.token}` }
+                });
+                const data = await res.json();
+                alert(data.message);
+            } catch (e) {
+                alert("Test failed: " + e.message);
+            }
+        },
+
+        async testConnectionB() {
+            if (!this.editingJob && !this.jobForm.id) {
+                alert("Please save the job first before testing.");
+                return;
+            }
+
+            try {
+                const res = await fetch(`/api/jobs/${this.jobForm.id}/test-b`, {
+                    method: 'POST',
+                    headers: { 'Authorization': `Bearer ${this.token}` }
+                });
+                const data = await res.json();
+                alert(data.message);
+            } catch (e) {
+                alert("Test failed: " + e.message);
+            }
+        },
+
+        async fetchProfilesA() {
+            const url = this.jobForm.config.url_a;
+            const key = this.jobForm.config.key_a;
+            const type = this.jobForm.type;
+            if (!url || !key) {
+                alert("Please enter Instance A URL and API Key first.");
+                return;
+            }
+            try {
+                const res = await fetch('/api/fetch-profiles', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json', 'Authorization': `Bearer ${this.token}` },
+                    body: JSON.stringify({ url, key, type, skip_ssl_verify: this.jobForm.config.skip_ssl_verify })
+                });
+                const data = await res.json();
+                if (data.status === 'success') {
+                    this.profilesA = data.profiles;
+                    if (data.profiles.length === 0) alert("No profiles found.");
+                } else {
+                    alert(data.message || "Failed to fetch profiles.");
+                }
+            } catch (e) {
+                alert("Fetch failed: " + e.message);
+            }
+        },
+
+        async restartService() {
+            if (!confirm("Are you sure you want to restart Syncarr?")) return;
+            try {
+                const res = await fetch('/api/restart', { method: 'POST', headers: { 'Authorization': `Bearer ${this.token}` } });
+                const data = await res.json();
+                alert(data.message);
+            } catch (e) {
+                alert("Error: " + e.message);
+            }
+        },
+
+        async shutdownService() {
+            if (!confirm("Are you sure you want to SHUTDOWN Syncarr? The service will stop.")) return;
+            try {
+                const res = await fetch('/api/shutdown', { method: 'POST', headers: { 'Authorization': `Bearer ${this.token}` } });
+                const data = await res.json();
+                alert(data.message);
+            } catch (e) {
+                alert("Error: " + e.message);
+            }
+        },
+
+        async fetchFoldersA() {
+            const url = this.jobForm.config.url_a;
+            const key = this.jobForm.config.key_a;
+            const type = this.jobForm.type;
+            if (!url || !key) {
+                alert("Please enter Instance A URL and API Key first.");
+                return;
+            }
+            try {
+                const res = await fetch('/api/fetch-rootfolders', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json', 'Authorization': `Bearer ${this.token}` },
+                    body: JSON.stringify({ url, key, type, skip_ssl_verify: this.jobForm.config.skip_ssl_verify })
+                });
+                const data = await res.json();
+                if (data.status === 'success') {
+                    this.foldersA = data.folders;
+                    if (data.folders.length === 0) alert("No root folders found.");
+                } else {
+                    alert(data.message || "Failed to fetch folders.");
+                }
+            } catch (e) {
+                alert("Fetch failed: " + e.message);
+            }
+        },
+
+        async fetchProfilesB() {
+            const url = this.jobForm.config.url_b;
+            const key = this.jobForm.config.key_b;
+            const type = this.jobForm.type;
+            if (!url || !key) {
+                alert("Please enter Instance B URL and API Key first.");
+                return;
+            }
+            try {
+                const res = await fetch('/api/fetch-profiles', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json', 'Authorization': `Bearer ${this.token}` },
+                    body: JSON.stringify({ url, key, type, skip_ssl_verify: this.jobForm.config.skip_ssl_verify })
+                });
+                const data = await res.json();
+                if (data.status === 'success') {
+                    this.profilesB = data.profiles;
+                    if (data.profiles.length === 0) alert("No profiles found.");
+                } else {
+                    alert(data.message || "Failed to fetch profiles.");
+                }
+            } catch (e) {
+                alert("Fetch failed: " + e.message);
+            }
+        },
+
+        async fetchFoldersB() {
+            const url = this.jobForm.config.url_b;
+            const key = this.jobForm.config.key_b;
+            const type = this.jobForm.type;
+            if (!url || !key) {
+                alert("Please enter Instance B URL and API Key first.");
+                return;
+            }
+            try {
+                const res = await fetch('/api/fetch-rootfolders', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json', 'Authorization': `Bearer ${this.token}` },
+                    body: JSON.stringify({ url, key, type, skip_ssl_verify: this.jobForm.config.skip_ssl_verify })
+                });
+                const data = await res.json();
+                if (data.status === 'success') {
+                    this.foldersB = data.folders;
+                    if (data.folders.length === 0) alert("No root folders found.");
+                } else {
+                    alert(data.message || "Failed to fetch folders.");
+                }
+            } catch (e) {
+                alert("Fetch failed: " + e.message);
+            }
+        },
+
+        async updateSettings() {
+            try {
+                const res = await fetch('/api/auth/update', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json', 'Authorization': `Bearer ${this.token}` },
+                    body: JSON.stringify(this.settingsForm)
+                });
+                if (!res.ok) throw new Error("Failed");
+                this.settingsStatus = "Credentials updated.";
+                this.settingsSuccess = true;
+            } catch (e) {
+                this.settingsStatus = "Error updating credentials.";
+                this.settingsSuccess = false;
+            }
+        },
+
+        async updatePort() {
+            try {
+                const res = await fetch('/api/auth/port', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json', 'Authorization': `Bearer ${this.token}` },
+                    body: JSON.stringify(this.portForm)
+                });
+                if (!res.ok) throw new Error("Failed");
+                this.settingsStatus = "Port updated. Please restart server.";
+                this.settingsSuccess = true;
+            } catch (e) {
+                this.settingsStatus = "Error updating port.";
+                this.settingsSuccess = false;
+            }
+        },
+
+        async updateSyncarr() {
+            this.updateStatus = 'updating';
+            this.updateMessage = 'Copying files from source...';
+
+            try {
+                const res = await fetch('/api/update', {
+                    method: 'POST',
+                    headers: { 'Authorization': `Bearer ${this.token}` }
+                });
+                const data = await res.json();
+
+                if (data.status === 'success' && data.restart_required === false) {
+                    this.updateStatus = 'success';
+                    this.updateMessage = data.message;
+                } else if (data.status === 'success' || data.status === 'partial') {
+                    this.updateStatus = data.status;
+                    this.updateMessage = data.message + ' Restarting service...';
+
+                    // Trigger restart
+                    await fetch('/api/restart', {
+                        method: 'POST',
+                        headers: { 'Authorization': `Bearer ${this.token}` }
+                    });
+
+                    // Wait and reload
+                    this.updateMessage = 'Restarting... Page will refresh in 5 seconds.';
+                    setTimeout(() => {
+                        this.updateMessage = 'Refreshing page...';
+                        setTimeout(() => location.reload(), 1000);
+                    }, 5000);
+                } else {
+                    this.updateStatus = 'error';
+                    this.updateMessage = data.message || 'Update failed';
+                }
+            } catch (e) {
+                this.updateStatus = 'error';
+                this.updateMessage = 'Error: ' + e.message;
+            }
+        },
+
+        connectLogs() {
+            if (this.socket) return;
+            const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+            this.socket = new WebSocket(`${protocol}//${window.location.host}/ws/logs`);
+            this.socket.onmessage = (event) => {
+                this.logs.push({ id: this.logIdCounter++, text: event.data });
+                this.$nextTick(() => {
+                    const container = document.getElementById('log-container');
+                    if (container) container.scrollTop = container.scrollHeight;
+                });
+            };
+        },
+
+        clearLogs() {
+            this.logs = [];
+        }
+    }
+}
@@ -0,0 +1,34 @@
+from utils.webhooks import parse_arr_webhook, token_matches
+
+
+def test_movie_file_delete_is_an_update():
+    # Sent by Radarr on every quality upgrade; the movie stays in the library
+    payload = {
+        "eventType": "MovieFileDelete",
+        "deleteReason": "upgrade",
+        "movie": {"id": 12, "title": "The Matrix", "tmdbId": 603},
+    }
+    event_type, items = parse_arr_webhook("radarr", payload)
+    assert event_type == "MovieFileDelete"
+    assert items == [{"id": 12, "external_id": 603, "title": "The Matrix", "deleted": False}]
+
+
+def test_movie_delete_marks_item_deleted():
+    payload = {"eventType": "MovieDelete", "movie": {"id": 12, "title": "The Matrix", "tmdbId": 603}}
+    _, items = parse_arr_webhook("radarr", payload)
+    assert items[0]["deleted"] is True
+
+
+def test_episode_file_delete_is_an_update():
+    payload = {"eventType": "EpisodeFileDelete", "series": {"id": 5, "title": "Show", "tvdbId": 81189}}
+    _, items = parse_arr_webhook("sonarr", payload)
+    assert items[0]["deleted"] is False
+
+
+def test_token_matches_non_ascii():
+    # Must be a plain mismatch (401), not a TypeError (500)
+    assert token_matches("secret", "é") is False
+    assert token_matches("sécret", "sécret") is True
+    assert token_matches("secret", "secret") is True
+    assert token_matches("secret", None) is False
+    assert token_matches(None, "secret") is False
@@ -0,0 +1,249 @@
+import collections
+import hashlib
+import http.client
+import json
+import queue
+import ssl
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Optional local proxy that sync runs talk to instead of the *arr instances
+# directly (`"arr_proxy": true` in gui_config.json). All jobs share it, so it
+# can keep upstream connections alive, rate-limit each instance across jobs,
+# and answer repeated reads of slow-changing endpoints from a short cache.
+DEFAULT_RATE = 10.0  # Requests per second per instance...
+DEFAULT_BURST = 20  # ...with bursts up to this many
+DEFAULT_CACHE_SECONDS = 30
+POOL_SIZE = 8  # Idle keep-alive connections kept per instance
+UPSTREAM_TIMEOUT = 120
+LATENCY_SAMPLES = 500  # Recent request latencies kept per instance for percentiles
+
+# GET endpoints whose responses rarely change during a sync window
+CACHEABLE_PATHS = (
+    "/system/status",
+    "/qualityprofile",
+    "/languageprofile",
+    "/metadataprofile",
+    "/rootfolder",
+    "/tag",
+)
+HOP_BY_HOP = {"connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te",
+              "trailers", "transfer-encoding", "upgrade", "host", "content-length"}
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self):
+        """Wait for a token. Returns the seconds spent waiting."""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                delay = (1 - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class Upstream:
+    """One *arr instance: connection pool, rate limit, cache and counters"""
+
+    def __init__(self, base_url, verify_ssl, rate, burst):
+        parts = urlsplit(base_url)
+        self.base_url = base_url
+        self.scheme = parts.scheme
+        self.netloc = parts.netloc
+        self.path_prefix = parts.path.rstrip("/")
+        self.context = None
+        if self.scheme == "https" and not verify_ssl:
+            self.context = ssl._create_unverified_context()
+        self.pool = queue.LifoQueue(maxsize=POOL_SIZE)
+        self.bucket = TokenBucket(rate, burst)
+        self.cache = {}  # {(path, api key): (expires, status, headers, body)}
+        self.cache_lock = threading.Lock()
+        self.stats_lock = threading.Lock()
+        self.requests = 0
+        self.cache_hits = 0
+        self.errors = 0
+        self.throttled = 0
+        self.throttle_seconds = 0.0
+        self.latencies = collections.deque(maxlen=LATENCY_SAMPLES)
+
+    def _connection(self):
+        try:
+            return self.pool.get_nowait(), True
+        except queue.Empty:
+            if self.scheme == "https":
+                return http.client.HTTPSConnection(self.netloc, timeout=UPSTREAM_TIMEOUT, context=self.context), False
+            return http.client.HTTPConnection(self.netloc, timeout=UPSTREAM_TIMEOUT), False
+
+    def _release(self, conn):
+        try:
+            self.pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def request(self, method, path, headers, body):
+        """Forward a request over a pooled connection. Returns (status, headers, body)."""
+        for attempt in range(2):
+            conn, reused = self._connection()
+            try:
+                conn.request(method, self.path_prefix + path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if reused and attempt == 0:
+                    continue  # The instance closed an idle keep-alive connection; retry on a fresh one
+                raise
+            except Exception:
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+            return response.status, response.getheaders(), data
+
+    def record(self, seconds, cache_hit=False, error=False, waited=0.0):
+        with self.stats_lock:
+            self.requests += 1
+            self.cache_hits += cache_hit
+            self.errors += error
+            if waited:
+                self.throttled += 1
+                self.throttle_seconds += waited
+            if not cache_hit:
+                self.latencies.append(seconds)
+
+    def stats(self):
+        with self.stats_lock:
+            latencies = sorted(self.latencies)
+            stats = {
+                "url": self.base_url,
+                "requests": self.requests,
+                "cache_hits": self.cache_hits,
+                "errors": self.errors,
+                "throttled": self.throttled,
+                "throttle_seconds": round(self.throttle_seconds, 3),
+                "idle_connections": self.pool.qsize(),
+            }
+        if latencies:
+            stats["latency_ms"] = {
+                "p50": round(latencies[len(latencies) // 2] * 1000, 1),
+                "p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] * 1000, 1),
+                "max": round(latencies[-1] * 1000, 1),
+            }
+        return stats
+
+
+def _cacheable(method, path):
+    if method != "GET":
+        return False
+    route = path.split("?", 1)[0].rstrip("/")
+    return any(route.endswith(suffix) for suffix in CACHEABLE_PATHS)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive towards the sync scripts too
+
+    def log_message(self, format, *args):
+        pass  # Sync runs log their own requests
+
+    def _proxy(self):
+        proxy = self.server.proxy
+        # /u/<instance key>/api/v3/...
+        _, _, rest = self.path.partition("/u/")
+        key, _, path = rest.partition("/")
+        upstream = proxy.upstreams.get(key)
+        body = None
+        if self.headers.get("Content-Length"):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+        if upstream is None:
+            return self._reply(404, [("Content-Type", "application/json")], b'{"message": "Unknown instance"}')
+
+        path = "/" + path
+        headers = {k: v for k, v in self.headers.items() if k.lower() not in HOP_BY_HOP}
+        headers["Host"] = upstream.netloc
+        cache_key = None
+        if _cacheable(self.command, path):
+            cache_key = (path, self.headers.get("X-Api-Key", ""))  # apikey in the query is part of path
+            with upstream.cache_lock:
+                hit = upstream.cache.get(cache_key)
+            if hit and hit[0] > time.monotonic():
+                upstream.record(0, cache_hit=True)
+                return self._reply(*hit[1:])
+
+        waited = upstream.bucket.take()
+        start = time.monotonic()
+        try:
+            status, response_headers, data = upstream.request(self.command, path, headers, body)
+        except Exception as e:
+            upstream.record(time.monotonic() - start, error=True, waited=waited)
+            message = json.dumps({"message": f"Proxy could not reach {upstream.netloc}: {e}"}).encode()
+            return self._reply(502, [("Content-Type", "application/json")], message)
+        upstream.record(time.monotonic() - start, error=status >= 500, waited=waited)
+
+        response_headers = [(k, v) for k, v in response_headers if k.lower() not in HOP_BY_HOP]
+        if cache_key and status == 200:
+            with upstream.cache_lock:
+                upstream.cache[cache_key] = (time.monotonic() + proxy.cache_seconds, status, response_headers, data)
+        self._reply(status, response_headers, data)
+
+    def _reply(self, status, headers, data):
+        self.send_response(status)
+        for k, v in headers:
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(data)
+
+    do_GET = do_POST = do_PUT = do_DELETE = do_HEAD = _proxy
+
+
+class ArrProxy:
+    def __init__(self, port=0, rate=DEFAULT_RATE, burst=DEFAULT_BURST, cache_seconds=DEFAULT_CACHE_SECONDS):
+        self.rate = rate
+        self.burst = burst
+        self.cache_seconds = cache_seconds
+        self.upstreams = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self.server.daemon_threads = True
+        self.server.proxy = self
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    def register(self, base_url, verify_ssl=True):
+        """URL a sync run should use instead of `base_url`; jobs sharing an instance share its limits and cache"""
+        base_url = base_url.rstrip("/")
+        key = hashlib.sha1(f"{base_url}|{verify_ssl}".encode()).hexdigest()[:12]
+        with self._lock:
+            if key not in self.upstreams:
+                self.upstreams[key] = Upstream(base_url, verify_ssl, self.rate, self.burst)
+        return f"http://127.0.0.1:{self.port}/u/{key}"
+
+    def stats(self):
+        with self._lock:
+            upstreams = list(self.upstreams.values())
+        return {"port": self.port, "instances": [u.stats() for u in upstreams]}
+
+    def shutdown(self):
+        self.server.shutdown()
+        self.server.server_close()
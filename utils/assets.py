@@ -0,0 +1,109 @@
+import gzip
+import hashlib
+import os
+import re
+
+from starlette.datastructures import Headers
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+
+try:
+    import brotli  # Optional: `pip install brotli` adds br variants
+except ImportError:
+    brotli = None
+
+# Asset types that get fingerprinted and precompressed at startup (pages are precompressed too)
+FINGERPRINT_EXTENSIONS = (".js", ".css")
+MEDIA_TYPES = {
+    ".js": "application/javascript",
+    ".css": "text/css",
+    ".html": "text/html; charset=utf-8",
+}
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+# Pages whose asset references are rewritten to the fingerprinted URLs
+PAGES = ("index.html",)
+
+
+class _Asset:
+    def __init__(self, body, media_type, cache_control):
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.digest = hashlib.sha256(body).hexdigest()[:16]
+        self.variants = {"identity": body, "gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(body, quality=11)
+
+    def pick(self, accept_encoding):
+        """Smallest variant the client accepts: (encoding, body)"""
+        accepted = {part.split(";")[0].strip() for part in accept_encoding.lower().split(",")}
+        for encoding in ("br", "gzip"):
+            if encoding in accepted and encoding in self.variants:
+                return encoding, self.variants[encoding]
+        return "identity", self.variants["identity"]
+
+
+def build_assets(directory, prefix="/static"):
+    """
+    Fingerprint and precompress the dashboard's assets. JS/CSS files are served
+    under content-hashed names (app.js -> app.<hash>.js) that can be cached
+    forever; pages are rewritten to reference those names and are revalidated
+    with an ETag. Returns ({request path: _Asset}, {original path: fingerprinted path}).
+    """
+    assets = {}
+    manifest = {}
+    for root, _, files in os.walk(directory):
+        for name in files:
+            full = os.path.join(root, name)
+            rel = os.path.relpath(full, directory).replace(os.sep, "/")
+            base, ext = os.path.splitext(rel)
+            if ext not in FINGERPRINT_EXTENSIONS:
+                continue
+            with open(full, "rb") as f:
+                body = f.read()
+            fingerprinted = f"{base}.{hashlib.sha256(body).hexdigest()[:10]}{ext}"
+            manifest[rel] = fingerprinted
+            assets[fingerprinted] = _Asset(body, MEDIA_TYPES[ext], IMMUTABLE)
+
+    if manifest:
+        references = re.compile("|".join(re.escape(f"{prefix}/{rel}") for rel in sorted(manifest, key=len, reverse=True)))
+    for page in PAGES:
+        full = os.path.join(directory, page)
+        if not os.path.exists(full):
+            continue
+        with open(full, "r", encoding="utf-8") as f:
+            html = f.read()
+        if manifest:
+            html = references.sub(lambda m: f"{prefix}/{manifest[m.group(0)[len(prefix) + 1:]]}", html)
+        assets[page] = _Asset(html.encode("utf-8"), MEDIA_TYPES[".html"], REVALIDATE)
+    return assets, manifest
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves the fingerprinted, precompressed variants built by
+    build_assets (gzip, plus brotli if installed), negotiated on Accept-Encoding.
+    Everything else falls through to plain StaticFiles.
+    """
+
+    def __init__(self, *, directory, prefix="/static", **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self.assets, self.manifest = build_assets(directory, prefix)
+
+    async def get_response(self, path, scope):
+        asset = self.assets.get(path.replace(os.sep, "/"))
+        if asset is None or scope["method"] not in ("GET", "HEAD"):
+            return await super().get_response(path, scope)
+
+        request_headers = Headers(scope=scope)
+        encoding, body = asset.pick(request_headers.get("accept-encoding", ""))
+        headers = {
+            "Cache-Control": asset.cache_control,
+            "ETag": f'"{asset.digest}-{encoding}"',  # Each encoding is its own representation
+            "Vary": "Accept-Encoding",
+        }
+        if asset.digest in request_headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        return Response(body, media_type=asset.media_type, headers=headers)
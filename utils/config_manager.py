@@ -1,25 +1,70 @@
+import contextlib
 import json
 import os
 import shutil
+import sys
 import threading
 import time
 from datetime import datetime
 
+from utils import profiling
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
 # Define the absolute path to the jobs file
 # This ensures it's always found regardless of where the app is started from
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 JOBS_FILE = os.path.join(BASE_DIR, "jobs.json")
 BACKUP_FILE = os.path.join(BASE_DIR, "jobs.json.bak")
 
+GUI_CONFIG_FILE = os.path.join(BASE_DIR, "gui_config.json")
+
 # Simple lock for thread safety within the process
 _file_lock = threading.Lock()
 
+@contextlib.contextmanager
+def _jobs_lock():
+    """
+    Lock the job store against other threads and other processes (several
+    scheduler nodes or API workers may share one jobs.json).
+    """
+    with profiling.span("jobs_lock.thread_wait"):
+        _file_lock.acquire()
+    try:
+        with open(JOBS_FILE + ".lock", 'a+') as lock_file:
+            if sys.platform == "win32":
+                lock_file.seek(0)
+                with profiling.span("jobs_lock.file_wait"):
+                    while True:
+                        try:
+                            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                            break
+                        except OSError:
+                            pass # LK_LOCK gives up after ~10s; keep waiting
+                try:
+                    yield
+                finally:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                with profiling.span("jobs_lock.file_wait"):
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    finally:
+        _file_lock.release()
+
 def load_jobs():
     """
     Load jobs from the JSON file with thread safety.
     Returns an empty list if the file doesn't exist or is invalid.
     """
-    with _file_lock:
+    with profiling.span("jobs.load"), _jobs_lock():
         if not os.path.exists(JOBS_FILE):
             return []
             
@@ -33,12 +78,31 @@ def load_jobs():
             print(f"Error loading jobs: {e}")
             return []
 
+_snapshot = {'key': None, 'jobs': []}
+
+def load_jobs_snapshot():
+    """
+    Like load_jobs(), but reuses the last parsed list while jobs.json is
+    unchanged on disk. For read-only callers (API polling): the returned list
+    and dicts are shared and must not be modified.
+    """
+    try:
+        st = os.stat(JOBS_FILE)
+        key = (st.st_mtime_ns, st.st_size, st.st_ino)
+    except OSError:
+        # Missing, or caught mid-write on a platform without atomic replace: read under the lock
+        return load_jobs()
+    if key != _snapshot['key']:
+        jobs = load_jobs()
+        _snapshot['key'], _snapshot['jobs'] = key, jobs
+    return _snapshot['jobs']
+
 def save_jobs(jobs):
     """
     Save jobs to the JSON file with thread safety and atomic write.
     Creates a backup of the existing file before overwriting.
     """
-    with _file_lock:
+    with profiling.span("jobs.save"), _jobs_lock():
         try:
             # 1. Create a backup if the file exists
             if os.path.exists(JOBS_FILE):
@@ -54,10 +118,8 @@ def save_jobs(jobs):
                 f.flush()
                 os.fsync(f.fileno()) # Ensure data is written to disk
 
-            # 3. Rename temporary file to actual file (atomic operation on POSIX, usually safe on Windows)
-            if os.path.exists(JOBS_FILE):
-                os.remove(JOBS_FILE)
-            os.rename(temp_file, JOBS_FILE)
+            # 3. Replace the actual file with the temporary one (atomic; readers never see it missing)
+            os.replace(temp_file, JOBS_FILE)
             
             return True
         except Exception as e:
@@ -69,6 +131,16 @@ def save_jobs(jobs):
                     pass
             return False
 
+def get_gui_setting(key, default=None):
+    """
+    Read a single setting from gui_config.json, falling back to `default`.
+    """
+    try:
+        with open(GUI_CONFIG_FILE, 'r') as f:
+            return json.load(f).get(key, default)
+    except Exception:
+        return default
+
 def _restore_backup():
     """
     Attempts to restore from backup file.
@@ -82,15 +154,23 @@ def _restore_backup():
             print(f"Error restoring backup: {e}")
     return []
 
-def update_job_status(job_id, status, last_run=None):
+def _write_jobs(jobs):
     """
-    Updates the status of a specific job.
+    Atomically write the jobs list. Caller must hold _jobs_lock().
+    """
+    temp_file = JOBS_FILE + ".tmp"
+    with open(temp_file, 'w') as f:
+        json.dump(jobs, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, JOBS_FILE)
+
+def update_job_fields(job_id, **fields):
     """
-    # We need to load, update, and save within the lock to prevent lost updates
-    # But since load_jobs and save_jobs have their own locks, we should implement
-    # a specific update function that holds the lock for the duration.
-    
-    with _file_lock:
+    Updates arbitrary top-level fields of a specific job in a single locked
+    read-modify-write. Returns True if the job was found.
+    """
+    with profiling.span("jobs.update_fields"), _jobs_lock():
         jobs = []
         if os.path.exists(JOBS_FILE):
             try:
@@ -102,26 +182,49 @@ def update_job_status(job_id, status, last_run=None):
         updated = False
         for job in jobs:
             if job['id'] == job_id:
-                job['status'] = status
-                if last_run:
-                    job['last_run'] = last_run
+                job.update(fields)
                 updated = True
                 break
         
         if updated:
             try:
-                # Write logic duplicated here to avoid re-acquiring lock if we used save_jobs
-                # or we could make save_jobs support an external lock.
-                # simpler to just write here for now or extract the write logic.
-                
-                temp_file = JOBS_FILE + ".tmp"
-                with open(temp_file, 'w') as f:
-                    json.dump(jobs, f, indent=4)
-                    f.flush()
-                    os.fsync(f.fileno())
-                
-                if os.path.exists(JOBS_FILE):
-                    os.remove(JOBS_FILE)
-                os.rename(temp_file, JOBS_FILE)
+                _write_jobs(jobs)
+            except Exception as e:
+                print(f"Error updating job: {e}")
+        return updated
+
+def update_job_status(job_id, status, last_run=None):
+    """
+    Updates the status of a specific job.
+    """
+    fields = {'status': status}
+    if last_run:
+        fields['last_run'] = last_run
+    return update_job_fields(job_id, **fields)
+
+def modify_jobs(mutate):
+    """
+    Apply `mutate(jobs)` to the job list in one locked read-modify-write, so
+    many changes cost a single backup and write. `mutate` edits the list in
+    place and returns a result, which is passed back. If it raises, nothing
+    is written.
+    """
+    with profiling.span("jobs.modify"), _jobs_lock():
+        jobs = []
+        if os.path.exists(JOBS_FILE):
+            try:
+                with open(JOBS_FILE, 'r') as f:
+                    jobs = json.load(f)
+            except json.JSONDecodeError:
+                print(f"Error decoding {JOBS_FILE}. Attempting to restore backup.")
+                jobs = _restore_backup()
+
+        result = mutate(jobs)
+
+        if os.path.exists(JOBS_FILE):
+            try:
+                shutil.copy2(JOBS_FILE, BACKUP_FILE)
             except Exception as e:
-                print(f"Error updating job status: {e}")
+                print(f"Warning: Failed to create backup: {e}")
+        _write_jobs(jobs)
+        return result
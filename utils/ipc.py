@@ -0,0 +1,176 @@
+import functools
+import hmac
+import json
+import os
+import socket
+import socketserver
+
+from utils.config_manager import BASE_DIR, get_gui_setting
+
+# The scheduler can run inside the web process ("embedded", default) or as its
+# own process (worker.py, "external") that the web tier talks to over a local
+# socket: a Unix socket where available, otherwise localhost TCP guarded by the
+# GUI secret key. One JSON request per line, one JSON response per line.
+DEFAULT_TCP_PORT = 8765
+CONNECT_TIMEOUT = 5
+CALL_TIMEOUT = 60
+# Set by web_app.py for its uvicorn worker processes: the scheduler runs in the
+# supervisor process, so workers reach it over IPC like an external scheduler
+REMOTE_ENV = "SYNCARR_SCHEDULER_IPC"
+
+# Scheduler functions exposed over IPC
+# (logs and progress are read from utils.live_state directly)
+IPC_OPS = ("start_job", "cancel_job", "queue_webhook_events", "get_status", "get_proxy_stats",
+          "get_profiling_stats", "capture_profile")
+
+
+class SchedulerUnavailable(Exception):
+    """The external scheduler process could not be reached"""
+
+
+# Settings are read once per process; changing them requires a restart (like the port)
+@functools.lru_cache(maxsize=None)
+def scheduler_mode():
+    return get_gui_setting("scheduler_mode", "embedded")
+
+
+@functools.lru_cache(maxsize=None)
+def _use_unix_socket():
+    return hasattr(socket, "AF_UNIX") and not get_gui_setting("ipc_port")
+
+
+@functools.lru_cache(maxsize=None)
+def _socket_path():
+    return get_gui_setting("ipc_socket") or os.path.join(BASE_DIR, "scheduler.sock")
+
+
+@functools.lru_cache(maxsize=None)
+def _tcp_address():
+    return ("127.0.0.1", int(get_gui_setting("ipc_port") or DEFAULT_TCP_PORT))
+
+
+@functools.lru_cache(maxsize=None)
+def _secret():
+    return get_gui_setting("secret_key", "syncarr_secret_key_change_me")
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for raw in self.rfile:
+            try:
+                request = json.loads(raw)
+                response = self.server.dispatch(request)
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            self.wfile.write(json.dumps(response).encode() + b"\n")
+            self.wfile.flush()
+
+
+class _ServerMixin:
+    daemon_threads = True
+    target = None
+    require_token = False
+
+    def dispatch(self, request):
+        if self.require_token and not hmac.compare_digest(str(request.get("token", "")).encode(), _secret().encode()):
+            return {"ok": False, "error": "unauthorized"}
+        op = request.get("op")
+        if op not in IPC_OPS:
+            return {"ok": False, "error": f"unknown op {op!r}"}
+        result = getattr(self.target, op)(*request.get("args", []))
+        return {"ok": True, "result": result}
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(_ServerMixin, socketserver.ThreadingUnixStreamServer):
+        pass
+
+
+class _TCPServer(_ServerMixin, socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    require_token = True
+
+
+def serve_forever(target):
+    """Serve `target`'s IPC_OPS (normally the scheduler module) until the process exits"""
+    if _use_unix_socket():
+        path = _socket_path()
+        if os.path.exists(path):
+            os.remove(path)  # Stale socket from a previous run
+        server = _UnixServer(path, _Handler)
+        os.chmod(path, 0o600)
+        where = path
+    else:
+        server = _TCPServer(_tcp_address(), _Handler)
+        where = "%s:%d" % server.server_address[:2]
+    server.target = target
+    print(f"Scheduler IPC listening on {where}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        if _use_unix_socket() and os.path.exists(_socket_path()):
+            os.remove(_socket_path())
+
+
+class RemoteScheduler:
+    """Client for a scheduler running in another process; mirrors the scheduler functions"""
+
+    def _call(self, op, *args):
+        request = {"op": op, "args": list(args)}
+        try:
+            if _use_unix_socket():
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.settimeout(CONNECT_TIMEOUT)
+                sock.connect(_socket_path())
+            else:
+                sock = socket.create_connection(_tcp_address(), timeout=CONNECT_TIMEOUT)
+                request["token"] = _secret()
+        except OSError as e:
+            raise SchedulerUnavailable(f"Scheduler process is not reachable: {e}")
+        try:
+            sock.settimeout(CALL_TIMEOUT)
+            with sock, sock.makefile("rwb") as stream:
+                stream.write(json.dumps(request).encode() + b"\n")
+                stream.flush()
+                line = stream.readline()
+        except OSError as e:
+            raise SchedulerUnavailable(f"Scheduler process did not respond: {e}")
+        if not line:
+            raise SchedulerUnavailable("Scheduler process closed the connection")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise SchedulerUnavailable(f"Scheduler error: {response.get('error')}")
+        return response.get("result")
+
+    def start_job(self, job_id):
+        return self._call("start_job", job_id)
+
+    def cancel_job(self, job_id):
+        return self._call("cancel_job", job_id)
+
+    def queue_webhook_events(self, job_id, source, items):
+        return self._call("queue_webhook_events", job_id, source, items)
+
+    def get_status(self):
+        return self._call("get_status")
+
+    def get_proxy_stats(self):
+        return self._call("get_proxy_stats")
+
+    def get_profiling_stats(self, reset=False):
+        return self._call("get_profiling_stats", reset)
+
+    def capture_profile(self, seconds, interval_ms, fmt):
+        return self._call("capture_profile", seconds, interval_ms, fmt)
+
+
+_remote = RemoteScheduler()
+
+
+def get_scheduler():
+    """The scheduler the API should talk to: the in-process module or the external worker"""
+    if scheduler_mode() == "external" or os.environ.get(REMOTE_ENV):
+        return _remote
+    import scheduler
+    return scheduler
@@ -0,0 +1,185 @@
+import os
+import socket
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+
+from utils.config_manager import BASE_DIR, get_gui_setting
+
+# Several scheduler processes (nodes) can share one job store. A node may only
+# run a job while it holds the job's lease; leases are renewed by a heartbeat
+# and expire if the node dies, so another node can take the job over.
+LEASE_TTL_SECONDS = 90
+HEARTBEAT_INTERVAL = 20
+
+_local = threading.local()
+_process_started = time.time()
+# Several processes may share a node id (the host name by default), so leases
+# also record which process holds them; only that process may renew or reuse one
+_instance_id = uuid.uuid4().hex
+
+
+def get_lease_db():
+    return get_gui_setting("lease_db") or os.path.join(BASE_DIR, "leases.db")
+
+
+def get_node_id():
+    """
+    Stable id of this scheduler node: SYNCARR_NODE_ID, the `node_id` GUI setting,
+    or the host name. Keeping it stable across restarts lets a restarted node
+    reclaim (and recover) the runs it owned before.
+    """
+    return os.environ.get("SYNCARR_NODE_ID") or get_gui_setting("node_id") or socket.gethostname()
+
+
+def _connect():
+    path = get_lease_db()
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != path:
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=DELETE")  # WAL doesn't work on network shares
+        conn.execute("""CREATE TABLE IF NOT EXISTS leases (
+            job_id TEXT PRIMARY KEY, node_id TEXT NOT NULL, run_id TEXT NOT NULL,
+            acquired_at REAL NOT NULL, heartbeat_at REAL NOT NULL, expires_at REAL NOT NULL)""")
+        conn.execute("""CREATE TABLE IF NOT EXISTS nodes (
+            node_id TEXT PRIMARY KEY, host TEXT, pid INTEGER, started_at REAL, heartbeat_at REAL)""")
+        for column in ("instance TEXT", "pid INTEGER"):  # Added after the first release
+            try:
+                conn.execute(f"ALTER TABLE leases ADD COLUMN {column}")
+            except sqlite3.OperationalError:
+                pass # Already there
+        _local.conn = conn
+        _local.path = path
+    return conn
+
+
+def pid_alive(pid):
+    """True if a process with this pid is running on this machine"""
+    if not pid:
+        return False
+    if pid == os.getpid():
+        return True
+    if sys.platform == "win32":
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, int(pid))  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        try:
+            code = ctypes.c_ulong()
+            kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+            return code.value == 259  # STILL_ACTIVE
+        finally:
+            kernel32.CloseHandle(handle)
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _held_by_other(row, node_id, now):
+    """Whether a lease row (node_id, expires_at, instance, pid) blocks this process"""
+    if not row or row[1] <= now:
+        return False
+    if row[0] != node_id:
+        return True
+    # Same node id: another live process on this host (e.g. the worker plus a second scheduler),
+    # unless it is this process or a dead predecessor whose lease hasn't expired yet
+    return row[2] is not None and row[2] != _instance_id and pid_alive(row[3])
+
+
+def try_acquire(job_id, node_id=None):
+    """
+    Claim the lease for a job. Succeeds if nobody holds it, the holder's lease
+    expired, this process already holds it, or it was held by a previous (now
+    dead) process of this node. Returns the run id or None.
+    """
+    node_id = node_id or get_node_id()
+    now = time.time()
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute("SELECT node_id, expires_at, instance, pid FROM leases WHERE job_id = ?", (job_id,)).fetchone()
+        if _held_by_other(row, node_id, now):
+            conn.execute("ROLLBACK")
+            return None
+        run_id = uuid.uuid4().hex
+        conn.execute(
+            "INSERT OR REPLACE INTO leases (job_id, node_id, run_id, acquired_at, heartbeat_at, expires_at, instance, pid) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job_id, node_id, run_id, now, now, now + LEASE_TTL_SECONDS, _instance_id, os.getpid()))
+        conn.execute("COMMIT")
+        return run_id
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def release(job_id, node_id=None, any_process=False):
+    """Drop this process's lease on a job; `any_process` also drops one left by a previous process of the node"""
+    node_id = node_id or get_node_id()
+    if any_process:
+        _connect().execute("DELETE FROM leases WHERE job_id = ? AND node_id = ?", (job_id, node_id))
+    else:
+        _connect().execute("DELETE FROM leases WHERE job_id = ? AND node_id = ? AND instance = ?",
+                           (job_id, node_id, _instance_id))
+
+
+def heartbeat(job_ids, node_id=None):
+    """Renew this node's leases for the given (running) jobs and record the node as alive"""
+    node_id = node_id or get_node_id()
+    now = time.time()
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for job_id in job_ids:
+            conn.execute("UPDATE leases SET heartbeat_at = ?, expires_at = ? WHERE job_id = ? AND node_id = ? AND instance = ?",
+                         (now, now + LEASE_TTL_SECONDS, job_id, node_id, _instance_id))
+        conn.execute(
+            "INSERT INTO nodes (node_id, host, pid, started_at, heartbeat_at) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(node_id) DO UPDATE SET host = excluded.host, pid = excluded.pid, "
+            "started_at = excluded.started_at, heartbeat_at = excluded.heartbeat_at",
+            (node_id, socket.gethostname(), os.getpid(), _process_started, now))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def held_elsewhere(job_id, node_id=None):
+    """True if another node, or another live process of this node, holds an unexpired lease on the job"""
+    node_id = node_id or get_node_id()
+    row = _connect().execute("SELECT node_id, expires_at, instance, pid FROM leases WHERE job_id = ?", (job_id,)).fetchone()
+    return _held_by_other(row, node_id, time.time())
+
+
+def live_owner(job_id):
+    """Node currently holding an unexpired lease on the job, or None"""
+    row = _connect().execute("SELECT node_id FROM leases WHERE job_id = ? AND expires_at > ?",
+                             (job_id, time.time())).fetchone()
+    return row[0] if row else None
+
+
+def list_leases():
+    now = time.time()
+    rows = _connect().execute(
+        "SELECT job_id, node_id, run_id, acquired_at, heartbeat_at, expires_at FROM leases ORDER BY acquired_at").fetchall()
+    return [{
+        'job_id': r[0], 'node_id': r[1], 'run_id': r[2],
+        'acquired_at': r[3], 'heartbeat_at': r[4], 'expires_at': r[5],
+        'expired': r[5] <= now,
+    } for r in rows]
+
+
+def list_nodes():
+    now = time.time()
+    rows = _connect().execute("SELECT node_id, host, pid, started_at, heartbeat_at FROM nodes ORDER BY node_id").fetchall()
+    return [{
+        'node_id': r[0], 'host': r[1], 'pid': r[2], 'started_at': r[3], 'heartbeat_at': r[4],
+        'alive': r[4] is not None and now - r[4] < LEASE_TTL_SECONDS,
+    } for r in rows]
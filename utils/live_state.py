@@ -0,0 +1,221 @@
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from utils.config_manager import BASE_DIR, get_gui_setting
+
+# Live log tails and progress of runs, shared by the scheduler (writer) and any
+# number of API worker processes (readers) on the same host. SQLite in WAL
+# mode lets readers run concurrently with the writer, which needs a local disk,
+# so the default file lives in the temp directory rather than next to the
+# config; each job's log has a monotonically increasing line counter, so
+# pollers can ask only for lines after a cursor.
+MAX_LOG_LINES = 5000  # Log lines kept per job (older ones are dropped)
+FLUSH_LINES = 200  # Buffered log lines written in one transaction...
+FLUSH_SECONDS = 0.25  # ...or after this long, whichever comes first
+PROGRESS_WRITE_INTERVAL = 1.0  # Seconds between progress snapshots while a run is active
+
+_local = threading.local()
+_pending = set()  # Publishers with buffered lines waiting for the flusher
+_pending_cond = threading.Condition()
+_flusher = None
+
+
+def get_live_state_db():
+    # Keyed by the install directory, so two installs on one host don't share a store
+    default = os.path.join(tempfile.gettempdir(),
+                           f"syncarr-live-{hashlib.sha1(BASE_DIR.encode()).hexdigest()[:12]}.db")
+    return get_gui_setting("live_state_db") or default
+
+
+def _connect():
+    path = get_live_state_db()
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != path:
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")  # Readers never block the writer (keep this file on a local disk)
+        conn.execute("PRAGMA synchronous=NORMAL")  # Live state can be rebuilt; no fsync per line
+        conn.execute("""CREATE TABLE IF NOT EXISTS log_heads (
+            job_id TEXT PRIMARY KEY, first_seq INTEGER NOT NULL, next_seq INTEGER NOT NULL)""")
+        conn.execute("""CREATE TABLE IF NOT EXISTS log_lines (
+            job_id TEXT NOT NULL, seq INTEGER NOT NULL, line TEXT NOT NULL,
+            PRIMARY KEY (job_id, seq)) WITHOUT ROWID""")
+        conn.execute("""CREATE TABLE IF NOT EXISTS progress (
+            job_id TEXT PRIMARY KEY, version INTEGER NOT NULL, snapshot TEXT NOT NULL)""")
+        _local.conn = conn
+        _local.path = path
+    return conn
+
+
+def _head(conn, job_id):
+    row = conn.execute("SELECT first_seq, next_seq FROM log_heads WHERE job_id = ?", (job_id,)).fetchone()
+    return row if row else (0, 0)
+
+
+def reset_logs(job_id, lines=()):
+    """Start a new log for a job (new run, or a tail restored after a restart)"""
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Start past the old head, so any cursor from the previous run is older than first_seq
+        next_seq = _head(conn, job_id)[1] + 1
+        conn.execute("DELETE FROM log_lines WHERE job_id = ?", (job_id,))
+        conn.execute("INSERT OR REPLACE INTO log_heads (job_id, first_seq, next_seq) VALUES (?, ?, ?)",
+                     (job_id, next_seq, next_seq))
+        _append(conn, job_id, lines)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def append_logs(job_id, lines):
+    if not lines:
+        return
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        _append(conn, job_id, lines)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _append(conn, job_id, lines):
+    first_seq, next_seq = _head(conn, job_id)
+    conn.executemany("INSERT OR REPLACE INTO log_lines (job_id, seq, line) VALUES (?, ?, ?)",
+                     ((job_id, next_seq + i, line) for i, line in enumerate(lines)))
+    next_seq += len(lines)
+    if next_seq - first_seq > MAX_LOG_LINES:
+        first_seq = next_seq - MAX_LOG_LINES
+        conn.execute("DELETE FROM log_lines WHERE job_id = ? AND seq < ?", (job_id, first_seq))
+    conn.execute("INSERT OR REPLACE INTO log_heads (job_id, first_seq, next_seq) VALUES (?, ?, ?)",
+                 (job_id, first_seq, next_seq))
+
+
+def read_logs(job_id, since=None):
+    """
+    Log lines of a job's current (or last) run. With `since` (the cursor of a
+    previous read) only newer lines are returned, unless the log was reset or
+    trimmed past the cursor in between. Returns {'lines', 'cursor', 'reset'};
+    `reset` means the lines replace what the caller had.
+    """
+    conn = _connect()
+    # One read transaction so the head and the lines are consistent
+    conn.execute("BEGIN")
+    try:
+        first_seq, next_seq = _head(conn, job_id)
+        reset = since is None or since < first_seq or since > next_seq
+        start = first_seq if reset else since
+        rows = conn.execute("SELECT line FROM log_lines WHERE job_id = ? AND seq >= ? ORDER BY seq",
+                            (job_id, start)).fetchall()
+    finally:
+        conn.execute("COMMIT")
+    return {'lines': [r[0] for r in rows], 'cursor': next_seq, 'reset': reset}
+
+
+def set_progress(job_id, snapshot):
+    _connect().execute(
+        "INSERT INTO progress (job_id, version, snapshot) VALUES (?, 1, ?) "
+        "ON CONFLICT(job_id) DO UPDATE SET version = version + 1, snapshot = excluded.snapshot",
+        (job_id, json.dumps(snapshot)))
+
+
+def get_progress(job_id):
+    """Latest progress snapshot of a job plus its change counter (`version`), or None"""
+    row = _connect().execute("SELECT version, snapshot FROM progress WHERE job_id = ?", (job_id,)).fetchone()
+    return {**json.loads(row[1]), 'version': row[0]} if row else None
+
+
+def forget_job(job_id):
+    """Drop everything stored for a deleted job"""
+    conn = _connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for table in ("log_lines", "log_heads", "progress"):
+            conn.execute(f"DELETE FROM {table} WHERE job_id = ?", (job_id,))
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def _schedule_flush(publisher):
+    global _flusher
+    with _pending_cond:
+        _pending.add(publisher)
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_flush_loop, name="live-state-flusher", daemon=True)
+            _flusher.start()
+        _pending_cond.notify()
+
+
+def _flush_loop():
+    # One long-lived thread (and so one connection) flushes the quiet tails of all runs
+    while True:
+        with _pending_cond:
+            while not _pending:
+                _pending_cond.wait()
+        time.sleep(FLUSH_SECONDS)  # Let the batch fill up
+        with _pending_cond:
+            publishers = list(_pending)
+            _pending.clear()
+        for publisher in publishers:
+            publisher.flush()
+
+
+class LivePublisher:
+    """
+    Publishes one run's log lines and progress to the shared store, batching
+    writes so a chatty sync costs a transaction per FLUSH_LINES lines (or
+    FLUSH_SECONDS) rather than one per line. Store errors are logged and
+    don't affect the run.
+    """
+
+    def __init__(self, job_id, lines=()):
+        self.job_id = job_id
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # Keeps batches in order when the flusher and a writer race
+        self._lines = []
+        self._scheduled = False
+        self._progress_written = 0.0
+        self._call(reset_logs, job_id, list(lines))
+
+    def log(self, line):
+        self.log_many([line])
+
+    def log_many(self, lines):
+        with self._lock:
+            self._lines.extend(lines)
+            if len(self._lines) < FLUSH_LINES:
+                if not self._scheduled:
+                    # Flush a quiet tail too, not only when the next line arrives
+                    self._scheduled = True
+                    _schedule_flush(self)
+                return
+        self.flush()
+
+    def progress(self, snapshot, force=False):
+        now = time.monotonic()
+        if force or now - self._progress_written >= PROGRESS_WRITE_INTERVAL:
+            self._progress_written = now
+            self._call(set_progress, self.job_id, snapshot)
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                lines, self._lines = self._lines, []
+                self._scheduled = False
+            if lines:
+                self._call(append_logs, self.job_id, lines)
+
+    def _call(self, func, *args):
+        try:
+            func(*args)
+        except Exception as e:
+            print(f"Live state store error for job {self.job_id}: {e}")
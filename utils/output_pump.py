@@ -0,0 +1,45 @@
+import os
+import time
+
+# Reading a sync's stdout in big chunks instead of line by line keeps the GUI
+# from becoming the bottleneck (and back-pressuring the child) on debug runs.
+READ_SIZE = 64 * 1024
+MARKER_PREFIX = "SYNCARR_"
+
+
+def read_line_batches(stream):
+    """
+    Yield the complete lines (decoded, stripped) available on a binary pipe,
+    one list per read. Bytes after the last newline wait for the next read,
+    so multi-byte characters are never split.
+    """
+    fd = stream.fileno()
+    pending = b""
+    while True:
+        chunk = os.read(fd, READ_SIZE)
+        if not chunk:
+            break
+        pending += chunk
+        end = pending.rfind(b"\n")
+        if end < 0:
+            continue
+        text = pending[:end].decode("utf-8", errors="replace")
+        pending = pending[end + 1:]
+        yield [line.strip() for line in text.split("\n")]
+    if pending:
+        yield [pending.decode("utf-8", errors="replace").strip()]
+
+
+class LineClock:
+    """`[HH:MM:SS] ` log prefix, formatted at most once per second"""
+
+    def __init__(self):
+        self._second = None
+        self._prefix = ""
+
+    def prefix(self):
+        now = int(time.time())
+        if now != self._second:
+            self._second = now
+            self._prefix = time.strftime("[%H:%M:%S] ", time.localtime(now))
+        return self._prefix
@@ -0,0 +1,295 @@
+import base64
+import collections
+import contextlib
+import contextvars
+import functools
+import marshal
+import os
+import sys
+import threading
+import time
+
+from utils import config_manager  # Module import: config_manager imports this module too
+
+# Opt-in instrumentation (`"profiling": true` in gui_config.json): per-route
+# latency histograms, slow-request logging with a breakdown of the timed spans
+# (job store, lock waits, *arr calls, auth), and an on-demand sampling profiler.
+# When off, the middleware isn't installed and span() hands out a shared no-op.
+DEFAULT_SLOW_MS = 1000
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+MAX_ROUTES = 200  # Further unmatched paths are counted under "(other)"
+MAX_PROFILE_SECONDS = 30  # Stays below the IPC call timeout
+DEFAULT_INTERVAL_MS = 5
+
+_NULL_SPAN = contextlib.nullcontext()
+_trace = contextvars.ContextVar("profiling_trace", default=None)
+_stats_lock = threading.Lock()
+_routes = {}  # {"GET /api/jobs": _Histogram}
+_spans = {}  # {span name: [count, total seconds, max seconds]}
+_since = time.time()
+_capture_lock = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    """Another profile is being captured in this process"""
+
+
+# Read once per process; changing it requires a restart (like the port)
+@functools.lru_cache(maxsize=None)
+def enabled():
+    return bool(config_manager.get_gui_setting("profiling", False))
+
+
+@functools.lru_cache(maxsize=None)
+def slow_request_seconds():
+    return float(config_manager.get_gui_setting("profiling_slow_ms", DEFAULT_SLOW_MS)) / 1000
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        with _stats_lock:
+            entry = _spans.setdefault(self.name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] = max(entry[2], elapsed)
+        trace = _trace.get()
+        if trace is not None:
+            # The request's own breakdown; shared with the threadpool thread running a sync endpoint
+            count, total = trace.get(self.name, (0, 0.0))
+            trace[self.name] = (count + 1, total + elapsed)
+        return False
+
+
+def span(name):
+    """Context manager timing a block under `name` (process totals plus the current request's breakdown)"""
+    if not enabled():
+        return _NULL_SPAN
+    return _Span(name)
+
+
+class _Histogram:
+    __slots__ = ("counts", "count", "errors", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds, error):
+        ms = seconds * 1000
+        i = 0
+        while i < len(BUCKETS_MS) and ms > BUCKETS_MS[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.errors += error
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction):
+        """Upper bound (ms) of the bucket holding the given fraction of requests"""
+        target = self.count * fraction
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if n and seen >= target:
+                return BUCKETS_MS[i] if i < len(BUCKETS_MS) else round(self.max * 1000, 1)
+        return None
+
+    def to_dict(self):
+        labels = [f"<={b}ms" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": round(self.total / self.count * 1000, 1) if self.count else None,
+            "max_ms": round(self.max * 1000, 1),
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+def _route_key(scope):
+    route = scope.get("route")  # Set by FastAPI's router once the request has been matched
+    if route is not None and getattr(route, "path", None):
+        return f"{scope['method']} {route.path}"
+    segment = scope["path"].strip("/").split("/", 1)[0]
+    return f"{scope['method']} /{segment}/*" if segment else f"{scope['method']} /"
+
+
+class ProfilingMiddleware:
+    """ASGI middleware recording request latency per route and logging slow requests"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status = 500
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        trace = {}
+        token = _trace.set(trace)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _trace.reset(token)
+            key = _route_key(scope)
+            with _stats_lock:
+                histogram = _routes.get(key)
+                if histogram is None:
+                    if len(_routes) >= MAX_ROUTES and "route" not in scope:
+                        key = "(other)"
+                    histogram = _routes.setdefault(key, _Histogram())
+                histogram.add(elapsed, status >= 500)
+            if elapsed >= slow_request_seconds():
+                print(f"Slow request: {scope['method']} {scope['path']} -> {status} in {elapsed * 1000:.0f} ms"
+                      f" ({describe_trace(trace, elapsed)})")
+
+
+def describe_trace(trace, elapsed):
+    """`jobs.load 640 ms x2, auth.jwt 0.3 ms x1, untimed 12 ms` (spans can nest, so shares may overlap)"""
+    parts = [f"{name} {total * 1000:.1f} ms x{count}"
+             for name, (count, total) in sorted(trace.items(), key=lambda item: -item[1][1])]
+    top_level = sum(total for name, (_, total) in trace.items() if not name.startswith("jobs_lock."))
+    parts.append(f"untimed {max(0.0, elapsed - top_level) * 1000:.1f} ms")
+    return ", ".join(parts)
+
+
+def snapshot(reset=False):
+    """
+    Route histograms and span totals of this process since start (or the last
+    reset). With `reset`, the counters are cleared in the same step.
+    """
+    global _since
+    with _stats_lock:
+        since = _since
+        routes = {key: h.to_dict() for key, h in sorted(_routes.items())}
+        spans = {name: {
+            "count": count,
+            "total_ms": round(total * 1000, 1),
+            "mean_ms": round(total / count * 1000, 2),
+            "max_ms": round(longest * 1000, 1),
+        } for name, (count, total, longest) in sorted(_spans.items())}
+        if reset:
+            _routes.clear()
+            _spans.clear()
+            _since = time.time()
+    return {"pid": os.getpid(), "since": since, "routes": routes, "spans": spans}
+
+
+# --- Sampling profiler -------------------------------------------------------
+
+def sample(seconds, interval):
+    """
+    Sample the Python stacks of all threads (except the caller) every
+    `interval` seconds for `seconds`. Wall-clock: waiting threads are counted
+    too, which is what shows lock and I/O stalls.
+    Returns Counter {(thread name, ((file, first line, function), ...root to leaf)): samples}.
+    """
+    me = threading.get_ident()
+    samples = collections.Counter()
+    code_keys = {}
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        names = {t.ident: t.name for t in threading.enumerate()}
+        frames = sys._current_frames()
+        for ident, frame in frames.items():
+            if ident == me:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                key = code_keys.get(code)
+                if key is None:
+                    key = code_keys[code] = (code.co_filename, code.co_firstlineno, code.co_name)
+                stack.append(key)
+                frame = frame.f_back
+            stack.reverse()
+            samples[(names.get(ident, f"thread-{ident}"), tuple(stack))] += 1
+        frames = None  # Don't keep other threads' frames alive while sleeping
+        time.sleep(interval)
+    return samples
+
+
+def _short_path(filename):
+    if filename.startswith(config_manager.BASE_DIR + os.sep):
+        return os.path.relpath(filename, config_manager.BASE_DIR)
+    return "/".join(filename.replace(os.sep, "/").split("/")[-2:])
+
+
+def to_collapsed(samples):
+    """Collapsed stacks (`thread;outer;inner count` per line) for flamegraph.pl, speedscope, etc."""
+    lines = []
+    for (thread, stack), count in samples.most_common():
+        frames = [f"{name} ({_short_path(path)}:{line})" for path, line, name in stack]
+        lines.append(";".join([thread.replace(";", ":").replace(" ", "_")] + frames) + f" {count}")
+    return "\n".join(lines) + "\n"
+
+
+def to_pstats(samples, interval):
+    """
+    The samples in the marshalled pstats format (`python -m pstats file`,
+    snakeviz). Call counts are sample counts and times are samples x interval.
+    """
+    stats = {}  # {func: [cc, nc, tt, ct, {caller: [cc, nc, tt, ct]}]}
+    for (_, stack), count in samples.items():
+        seconds = count * interval
+        seen = set()
+        for depth, func in enumerate(stack):
+            entry = stats.setdefault(func, [0, 0, 0.0, 0.0, {}])
+            leaf = depth == len(stack) - 1
+            if func not in seen:  # Recursion counts once towards cumulative time
+                seen.add(func)
+                entry[0] += count
+                entry[1] += count
+                entry[3] += seconds
+            if leaf:
+                entry[2] += seconds
+            if depth:
+                edge = entry[4].setdefault(stack[depth - 1], [0, 0, 0.0, 0.0])
+                edge[0] += count
+                edge[1] += count
+                edge[2] += seconds if leaf else 0.0
+                edge[3] += seconds
+    return marshal.dumps({
+        func: (cc, nc, tt, ct, {caller: tuple(edge) for caller, edge in callers.items()})
+        for func, (cc, nc, tt, ct, callers) in stats.items()
+    })
+
+
+def capture_profile(seconds, interval_ms=DEFAULT_INTERVAL_MS, fmt="collapsed"):
+    """
+    Profile this process for `seconds` (capped at MAX_PROFILE_SECONDS). Returns
+    collapsed stacks as text, or pstats data base64-encoded (so it can cross IPC).
+    Raises ProfilerBusy if a capture is already running.
+    """
+    if not _capture_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already being captured")
+    try:
+        interval = max(1, int(interval_ms)) / 1000
+        samples = sample(min(float(seconds), MAX_PROFILE_SECONDS), interval)
+    finally:
+        _capture_lock.release()
+    if fmt == "pstats":
+        return base64.b64encode(to_pstats(samples, interval)).decode("ascii")
+    return to_collapsed(samples)
@@ -0,0 +1,164 @@
+import time
+from datetime import datetime
+
+# Weight of the newest rate sample in the moving average
+EWMA_ALPHA = 0.3
+# Markers can arrive in bursts; only take a rate sample once this much time has passed
+MIN_SAMPLE_SECONDS = 0.5
+# Weight of the latest run when blending phase durations into the stored history
+HISTORY_WEIGHT = 0.5
+
+
+class ProgressTracker:
+    """
+    Tracks SYNCARR_PROGRESS markers for one run: smoothed throughput (EWMA),
+    ETA, and elapsed time per phase. `phase_history` holds the phase durations
+    ({phase: seconds}, in run order) recorded for previous runs and is used to
+    predict the ETA before the first marker arrives and for phases not yet started.
+    """
+
+    def __init__(self, phase_history=None):
+        self.phase_history = dict(phase_history or {})
+        self.started_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.finished_at = None
+        self.state = "Running"
+        self.current = 0
+        self.total = 0
+        self.phase = "Starting"
+        self.rate = None
+        self.phases = []  # Completed phases: [{name, duration_seconds, items, rate}]
+
+        self._start = time.monotonic()
+        self._end = None
+        self._phase_start = self._start
+        self._sample_time = self._start
+        self._sample_current = 0
+        self._seen_marker = False
+
+    @classmethod
+    def from_snapshot(cls, snapshot, state):
+        """Rebuild a finished tracker from a persisted snapshot (e.g. after a restart)"""
+        tracker = cls()
+        tracker.state = state
+        tracker.started_at = snapshot.get('started_at', tracker.started_at)
+        tracker.current = snapshot.get('current', 0)
+        tracker.total = snapshot.get('total', 0)
+        tracker.phase = snapshot.get('phase', tracker.phase)
+        tracker.phases = list(snapshot.get('phases') or [])
+        tracker._end = time.monotonic()
+        tracker._start = tracker._end - snapshot.get('elapsed_seconds', 0)
+        tracker._phase_start = tracker._end
+        return tracker
+
+    def update(self, current, total, phase):
+        now = time.monotonic()
+        if not self._seen_marker or phase != self.phase:
+            if self._seen_marker:
+                self._close_phase(now)
+            else:
+                # Time before the first marker counts as its own phase
+                self.phases.append({'name': self.phase, 'duration_seconds': round(now - self._start, 3), 'items': 0, 'rate': None})
+            self._seen_marker = True
+            self.phase = phase
+            self._phase_start = now
+            self._sample_time = now
+            self._sample_current = current
+            self.rate = None
+        else:
+            dt = now - self._sample_time
+            if dt >= MIN_SAMPLE_SECONDS:
+                sample = max(0, current - self._sample_current) / dt
+                self.rate = sample if self.rate is None else EWMA_ALPHA * sample + (1 - EWMA_ALPHA) * self.rate
+                self._sample_time = now
+                self._sample_current = current
+        self.current = current
+        self.total = total
+
+    def _close_phase(self, now):
+        duration = now - self._phase_start
+        self.phases.append({
+            'name': self.phase,
+            'duration_seconds': round(duration, 3),
+            'items': self.current,
+            'rate': round(self.current / duration, 3) if duration > 0 else None,
+        })
+
+    def finish(self, success=True):
+        if self._end is not None:
+            return
+        self._end = time.monotonic()
+        if self._seen_marker:
+            self._close_phase(self._end)
+        self.state = "Finished" if success else "Failed"
+        self.finished_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.rate = None
+
+    @property
+    def percent(self):
+        return int((self.current / self.total) * 100) if self.total > 0 else 0
+
+    def _eta(self, now):
+        """Returns (eta_seconds, source) or (None, None) if no estimate is possible"""
+        if self._end is not None:
+            return 0, None
+
+        later_phases = list(self.phase_history)
+        if self._seen_marker and self.phase in self.phase_history:
+            later_phases = later_phases[later_phases.index(self.phase) + 1:]
+        history_after = sum(self.phase_history[p] for p in later_phases)
+
+        if not self._seen_marker:
+            if not self.phase_history:
+                return None, None
+            return max(0.0, sum(self.phase_history.values()) - (now - self._start)), "history"
+
+        if self.rate and self.total > self.current:
+            return (self.total - self.current) / self.rate + history_after, "rate"
+        if self.total and self.current >= self.total:
+            return history_after, "rate"
+        if self.phase in self.phase_history:
+            remaining = self.phase_history[self.phase] - (now - self._phase_start)
+            return max(0.0, remaining) + history_after, "history"
+        return None, None
+
+    def snapshot(self):
+        now = self._end if self._end is not None else time.monotonic()
+        eta, eta_source = self._eta(now)
+        return {
+            'current': self.current,
+            'total': self.total,
+            'phase': self.phase,
+            'percent': self.percent,
+            'state': self.state,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'elapsed_seconds': round(now - self._start, 3),
+            'phase_elapsed_seconds': round(now - self._phase_start, 3) if self._end is None else 0,
+            'rate': round(self.rate, 3) if self.rate is not None else None,
+            'eta_seconds': round(eta, 1) if eta is not None else None,
+            'eta_source': eta_source,
+            'phases': list(self.phases),
+        }
+
+    def phase_items(self):
+        """{phase: items processed} for the phases seen so far, including the current one"""
+        items = {}
+        for p in self.phases:
+            items[p['name']] = items.get(p['name'], 0) + p['items']
+        if self._seen_marker and self._end is None:
+            items[self.phase] = items.get(self.phase, 0) + self.current
+        return items
+
+    def merged_phase_history(self):
+        """
+        Blend this run's phase durations into the previous history, keeping
+        this run's phase order. Phases not seen this run are dropped.
+        """
+        durations = {}
+        for p in self.phases:
+            durations[p['name']] = durations.get(p['name'], 0) + p['duration_seconds']
+        merged = {}
+        for name, duration in durations.items():
+            previous = self.phase_history.get(name)
+            merged[name] = duration if previous is None else HISTORY_WEIGHT * duration + (1 - HISTORY_WEIGHT) * previous
+        return {k: round(v, 3) for k, v in merged.items()}
@@ -0,0 +1,140 @@
+import os
+import subprocess
+import sys
+
+try:
+    import resource  # POSIX only
+except ImportError:
+    resource = None
+
+# Per-job limits for the sync process: job['resources'], on top of the
+# `resource_limits` GUI setting.
+#   nice            - scheduling priority, 0 (normal) to 19 (lowest)
+#   memory_mb       - address-space limit (RLIMIT_AS); the sync fails with MemoryError past it
+#   max_open_files  - file descriptor limit (RLIMIT_NOFILE)
+RESOURCE_LIMIT_KEYS = ("nice", "memory_mb", "max_open_files")
+
+# Windows has priority classes instead of nice values
+_WINDOWS_PRIORITY = (
+    (15, "IDLE_PRIORITY_CLASS"),
+    (5, "BELOW_NORMAL_PRIORITY_CLASS"),
+)
+
+
+def effective_limits(job, defaults=None):
+    """
+    Job limits merged over the global defaults, without unset values. Invalid
+    values (e.g. a hand-edited `"nice": "low"`) are logged and ignored rather
+    than failing the run.
+    """
+    limits = {}
+    sources = (("resource_limits setting", defaults), (f"job {job.get('name')}", job.get('resources')))
+    for source, values in sources:
+        if not isinstance(values, dict):
+            if values:
+                print(f"Ignoring invalid resource limits in {source}: {values!r}")
+            continue
+        for key, value in values.items():
+            if key not in RESOURCE_LIMIT_KEYS:
+                continue
+            if value in (None, ""):
+                limits.pop(key, None)  # Unset here, even if the defaults set it
+                continue
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                value = None
+            error = f"{key} must be a whole number" if value is None else validate_limits({key: value})
+            if error:
+                print(f"Ignoring resource limit {key}={values[key]!r} in {source}: {error}")
+                continue
+            limits[key] = value
+    return limits
+
+
+def validate_limits(limits):
+    """Error message for invalid limits, or None"""
+    unknown = set(limits) - set(RESOURCE_LIMIT_KEYS)
+    if unknown:
+        return f"Unknown resource limits: {', '.join(sorted(unknown))}"
+    for key, value in limits.items():
+        if value in (None, ""):
+            continue
+        if not isinstance(value, int) or isinstance(value, bool):
+            return f"{key} must be a whole number"
+        if key == "nice" and not 0 <= value <= 19:
+            return "nice must be between 0 and 19"
+        if key != "nice" and value < 1:
+            return f"{key} must be at least 1"
+    return None
+
+
+def popen_kwargs(limits):
+    """Extra subprocess.Popen arguments for `limits` (Windows priority class; nothing elsewhere)"""
+    if sys.platform != "win32" or not limits:
+        return {}
+    nice = limits.get("nice", 0)
+    for threshold, name in _WINDOWS_PRIORITY:
+        if nice >= threshold:
+            return {"creationflags": getattr(subprocess, name)}
+    return {}
+
+
+def apply_limits(pid, limits):
+    """
+    Apply `limits` to a just-started child. Done from the parent (setpriority /
+    prlimit) rather than a preexec_fn, which isn't safe in a threaded process.
+    Returns the limits that can't be enforced on this platform.
+    """
+    if not limits or sys.platform == "win32":
+        return [k for k in limits if k != "nice"]
+    unsupported = []
+    if limits.get("nice"):
+        os.setpriority(os.PRIO_PROCESS, pid, limits["nice"])
+    rlimits = (("memory_mb", "RLIMIT_AS", 1024 * 1024), ("max_open_files", "RLIMIT_NOFILE", 1))
+    for key, name, scale in rlimits:
+        if not limits.get(key):
+            continue
+        if not hasattr(resource, "prlimit"):
+            unsupported.append(key)  # prlimit is Linux-only
+            continue
+        which = getattr(resource, name)
+        _, hard = resource.prlimit(pid, which)
+        value = limits[key] * scale
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        resource.prlimit(pid, which, (value, value))
+    return unsupported
+
+
+def wait_with_usage(process):
+    """
+    Wait for a Popen child and return its resource usage (None where
+    os.wait4 isn't available). Sets process.returncode like Popen.wait().
+    """
+    if not hasattr(os, "wait4"):
+        process.wait()
+        return None
+    try:
+        _, status, usage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        process.wait()  # Already reaped elsewhere
+        return None
+    process.returncode = os.waitstatus_to_exitcode(status)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss_divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        'cpu_user_seconds': round(usage.ru_utime, 3),
+        'cpu_system_seconds': round(usage.ru_stime, 3),
+        'max_rss_mb': round(usage.ru_maxrss / rss_divisor, 1),
+        'block_reads': usage.ru_inblock,
+        'block_writes': usage.ru_oublock,
+        'voluntary_switches': usage.ru_nvcsw,
+        'involuntary_switches': usage.ru_nivcsw,
+    }
+
+
+def describe_usage(usage, wall_seconds):
+    return (f"CPU {usage['cpu_user_seconds']:.1f}s user / {usage['cpu_system_seconds']:.1f}s sys "
+            f"over {wall_seconds:.1f}s, peak RSS {usage['max_rss_mb']:.0f} MB, "
+            f"{usage['block_reads']} block reads / {usage['block_writes']} block writes")
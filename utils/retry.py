@@ -0,0 +1,130 @@
+import random
+import re
+from datetime import datetime, timedelta
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Per-job `retry` settings override these
+DEFAULT_RETRY_POLICY = {
+    'max_attempts': 3,             # Retries after a transient failure (0 disables retrying)
+    'base_delay_seconds': 30,      # First retry delay; doubles every attempt
+    'max_delay_seconds': 1800,
+    'jitter': 0.2,                 # +/- fraction of the delay, so jobs on one host don't retry together
+    'breaker_threshold': 5,        # Consecutive failures that open the circuit breaker
+    'breaker_cooldown_minutes': 60,
+}
+
+# Only look at the end of the output when classifying
+CLASSIFY_TAIL_LINES = 50
+
+# GUI (`[12:00:00] `) and logging (`2024-01-01 12:00:00,123 `) timestamps are
+# stripped first so their digits can't look like status codes
+TIMESTAMP_RE = re.compile(r"^\s*(?:\[\d{1,2}:\d{2}:\d{2}\]\s*)?(?:\d{4}-\d{2}-\d{2}[ t]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?\s*)?")
+# Status codes only count next to HTTP context, not as bare numbers ("403 movies")
+_STATUS = r"(?:status(?: code)?|http(?:/\d(?:\.\d)?)?|response|returned)\W{0,3}"
+
+# (category, transient, pattern); first match wins, checked newest line first
+FAILURE_PATTERNS = [
+    ('auth', False, re.compile(
+        _STATUS + r"40[13]\b|\b40[13] (?:client error|unauthori[sz]ed|forbidden)"
+        r"|unauthori[sz]ed|forbidden|invalid api ?key")),
+    ('connection', True, re.compile(
+        r"connection ?refused|connectionerror|max retries exceeded|failed to establish|timed ?out|timeout"
+        r"|name or service not known|temporary failure in name resolution|getaddrinfo failed|no route to host"
+        r"|connection (?:reset|aborted)|remote ?(?:end closed|disconnected)")),
+    ('server', True, re.compile(
+        _STATUS + r"50[0234]\b|\b50[0234] server error|bad gateway|service unavailable|internal server error")),
+    # A traceback, or an exception line such as `KeyError: 'id'` / `requests.exceptions.HTTPError: ...`
+    ('script', False, re.compile(r"^traceback \(most recent call last\)|(?:^|\s)(?:[a-z_][\w.]*\.)?[a-z_]\w*(?:error|exception):")),
+]
+
+
+def get_retry_policy(job):
+    policy = dict(DEFAULT_RETRY_POLICY)
+    policy.update({k: v for k, v in (job.get('retry') or {}).items() if v is not None and k in policy})
+    return policy
+
+
+def classify_failure(exit_code, output_lines):
+    """
+    Classify a failed run from its exit code and the tail of its output.
+    Returns (category, transient). Only transient failures are retried.
+    """
+    if exit_code is not None and exit_code < 0:
+        # Killed by a signal (e.g. OOM killer, service stop) - worth another try
+        return 'killed', True
+    for line in reversed(output_lines[-CLASSIFY_TAIL_LINES:]):
+        text = TIMESTAMP_RE.sub("", line.lower(), count=1)
+        for category, transient, pattern in FAILURE_PATTERNS:
+            if pattern.search(text):
+                return category, transient
+    return 'unknown', False
+
+
+def backoff_delay(attempt, policy):
+    """Exponential backoff with jitter for the given retry attempt (1-based), in seconds"""
+    delay = min(policy['max_delay_seconds'], policy['base_delay_seconds'] * (2 ** (attempt - 1)))
+    jitter = delay * policy['jitter']
+    return max(1.0, delay + random.uniform(-jitter, jitter))
+
+
+def record_failure(job, category, transient, now, reason=""):
+    """
+    Work out the retry state after a failed run. Returns (fields, message) where
+    `fields` are the job fields to persist.
+    """
+    policy = get_retry_policy(job)
+    failures = int(job.get('consecutive_failures') or 0) + 1
+    attempt = int(job.get('retry_attempt') or 0)
+
+    fields = {
+        'consecutive_failures': failures,
+        'last_failure': {'category': category, 'transient': transient, 'reason': reason, 'at': now.strftime(TIME_FORMAT)},
+        'retry_attempt': 0,
+        'next_retry_at': None,
+        'circuit_open_until': None,
+    }
+
+    if failures >= policy['breaker_threshold']:
+        until = now + timedelta(minutes=policy['breaker_cooldown_minutes'])
+        fields['circuit_open_until'] = until.strftime(TIME_FORMAT)
+        return fields, f"Circuit breaker open after {failures} consecutive failures; paused until {fields['circuit_open_until']}"
+
+    if not transient:
+        return fields, f"Failure classified as '{category}' (not transient); not retrying"
+
+    if attempt >= policy['max_attempts']:
+        return fields, f"Failure classified as '{category}'; gave up after {attempt} retries"
+
+    attempt += 1
+    retry_at = now + timedelta(seconds=backoff_delay(attempt, policy))
+    fields['retry_attempt'] = attempt
+    fields['next_retry_at'] = retry_at.strftime(TIME_FORMAT)
+    return fields, f"Failure classified as '{category}'; retry {attempt}/{policy['max_attempts']} at {fields['next_retry_at']}"
+
+
+def success_fields():
+    """Job fields that clear the retry/breaker state after a successful run"""
+    return {
+        'consecutive_failures': 0,
+        'retry_attempt': 0,
+        'next_retry_at': None,
+        'circuit_open_until': None,
+    }
+
+
+def _parse(value):
+    try:
+        return datetime.strptime(value, TIME_FORMAT) if value else None
+    except ValueError:
+        return None
+
+
+def circuit_open(job, now):
+    until = _parse(job.get('circuit_open_until'))
+    return until is not None and now < until
+
+
+def retry_due(job, now):
+    retry_at = _parse(job.get('next_retry_at'))
+    return retry_at is not None and now >= retry_at
@@ -0,0 +1,146 @@
+import contextlib
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+
+from utils.config_manager import BASE_DIR
+
+if sys.platform == "win32":
+    import msvcrt
+else:
+    import fcntl
+
+# Persisted record of in-flight runs, used to recover after the service is killed mid-run
+JOURNAL_FILE = os.path.join(BASE_DIR, "run_journal.json")
+
+_journal_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def _locked():
+    """
+    Lock the journal against other threads and other processes (the worker,
+    several nodes sharing one install folder), like config_manager._jobs_lock.
+    """
+    with _journal_lock:
+        with open(JOURNAL_FILE + ".lock", 'a+') as lock_file:
+            if sys.platform == "win32":
+                lock_file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        pass # LK_LOCK gives up after ~10s; keep waiting
+                try:
+                    yield
+                finally:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _read():
+    if not os.path.exists(JOURNAL_FILE):
+        return {}
+    try:
+        with open(JOURNAL_FILE, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error reading run journal: {e}")
+        return {}
+
+
+def _write(entries):
+    temp_file = JOURNAL_FILE + ".tmp"
+    try:
+        with open(temp_file, 'w') as f:
+            json.dump(entries, f, indent=4)
+        os.replace(temp_file, JOURNAL_FILE)
+    except Exception as e:
+        print(f"Error writing run journal: {e}")
+
+
+def load_journal():
+    with _locked():
+        return _read()
+
+
+def record_run(job_id, **fields):
+    """Create or update the journal entry of a running job"""
+    with _locked():
+        entries = _read()
+        entries.setdefault(job_id, {}).update(fields)
+        _write(entries)
+
+
+def remove_run(job_id):
+    with _locked():
+        entries = _read()
+        if entries.pop(job_id, None) is not None:
+            _write(entries)
+
+
+def _process_command_line(pid):
+    """Command line of a running process, or None if it isn't running / can't be inspected"""
+    try:
+        if sys.platform.startswith("linux"):
+            with open(f"/proc/{pid}/cmdline", 'rb') as f:
+                return f.read().replace(b'\0', b' ').decode(errors='replace')
+        if sys.platform == "win32":
+            result = subprocess.run(
+                ["powershell", "-NoProfile", "-Command",
+                 f"(Get-CimInstance Win32_Process -Filter 'ProcessId={int(pid)}').CommandLine"],
+                capture_output=True, text=True, timeout=30)
+            return result.stdout.strip() or None
+        result = subprocess.run(["ps", "-p", str(int(pid)), "-o", "command="], capture_output=True, text=True, timeout=10)
+        return result.stdout.strip() or None
+    except Exception:
+        return None
+
+
+def kill_orphan(pid):
+    """
+    Kill a leftover sync child from a previous service instance. Only kills the
+    process if it still looks like index.py, so a recycled PID is left alone.
+    Returns True if a process was killed.
+    """
+    if not pid:
+        return False
+    command_line = _process_command_line(pid)
+    if not command_line or "index.py" not in command_line:
+        return False
+    try:
+        if sys.platform == "win32":
+            subprocess.run(["taskkill", "/PID", str(int(pid)), "/T", "/F"], capture_output=True, timeout=30)
+        else:
+            os.kill(int(pid), signal.SIGTERM)
+        return True
+    except Exception as e:
+        print(f"Failed to kill orphaned sync process {pid}: {e}")
+        return False
+
+
+def read_log_tail(path, max_lines):
+    """Last `max_lines` lines of a run's log file (without trailing newlines)"""
+    if not path or not os.path.exists(path):
+        return []
+    try:
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+            # Lines are short; 256 bytes each is plenty to get max_lines
+            f.seek(max(0, size - max_lines * 256))
+            data = f.read().decode('utf-8', errors='replace')
+        return data.splitlines()[-max_lines:]
+    except Exception as e:
+        print(f"Error reading log tail {path}: {e}")
+        return []
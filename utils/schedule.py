@@ -0,0 +1,319 @@
+import re
+from datetime import datetime, timedelta
+from urllib.parse import urlparse
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+# Staggered slots are aligned to this fixed point so they stay put across restarts
+SLOT_EPOCH = datetime(2000, 1, 1)
+
+CRON_MACROS = {
+    "@hourly": "0 * * * *",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@weekly": "0 0 * * 0",
+    "@monthly": "0 0 1 * *",
+}
+
+# (min, max) for minute, hour, day of month, month, day of week
+CRON_FIELDS = [(0, 59), (0, 23), (1, 31), (1, 12), (0, 7)]
+
+
+class CronSchedule:
+    """
+    Standard 5-field cron expression (minute hour day-of-month month day-of-week).
+    Supports `*`, lists, ranges, steps and the @hourly/@daily/@weekly/@monthly macros.
+    As in cron, when both day fields are restricted a day matches if either does.
+    """
+
+    def __init__(self, expr):
+        self.expr = expr
+        text = CRON_MACROS.get(expr.strip().lower(), expr)
+        parts = text.split()
+        if len(parts) != 5:
+            raise ValueError(f"Cron expression must have 5 fields: {expr!r}")
+        fields = [_parse_cron_field(p, lo, hi) for p, (lo, hi) in zip(parts, CRON_FIELDS)]
+        self.minutes, self.hours, self.days, self.months, dow = fields
+        self.weekdays = {d % 7 for d in dow}  # 7 is also Sunday
+        self.dom_any = parts[2] == "*"
+        self.dow_any = parts[4] == "*"
+
+    def _day_matches(self, dt):
+        dom = dt.day in self.days
+        dow = (dt.weekday() + 1) % 7 in self.weekdays  # cron: 0 = Sunday
+        if self.dom_any or self.dow_any:
+            return dom and dow
+        return dom or dow
+
+    def matches(self, dt):
+        return (dt.minute in self.minutes and dt.hour in self.hours
+                and dt.month in self.months and self._day_matches(dt))
+
+    def next_after(self, dt):
+        """First matching minute strictly after `dt`"""
+        t = dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.months:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+            elif t.hour not in self.hours:
+                t = t.replace(minute=0) + timedelta(hours=1)
+            elif t.minute not in self.minutes:
+                t += timedelta(minutes=1)
+            else:
+                return t
+        raise ValueError(f"Cron expression never matches: {self.expr!r}")
+
+
+def _parse_cron_field(text, lo, hi):
+    values = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step < 1:
+                raise ValueError(f"Invalid cron step: {text!r}")
+        if part == "*":
+            start, end = lo, hi
+        elif "-" in part:
+            start, end = (int(v) for v in part.split("-", 1))
+        else:
+            start = int(part)
+            end = hi if step > 1 else start
+        if start < lo or end > hi or start > end:
+            raise ValueError(f"Cron field out of range ({lo}-{hi}): {text!r}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+_cron_cache = {}
+
+def get_cron(expr):
+    """Parse a cron expression, caching the result. Raises ValueError if invalid."""
+    schedule = _cron_cache.get(expr)
+    if schedule is None:
+        schedule = _cron_cache[expr] = CronSchedule(expr)
+    return schedule
+
+
+def job_hosts(job):
+    """Hostnames of the *arr instances a job talks to"""
+    hosts = set()
+    config = job.get('config') or {}
+    for key in ('url_a', 'url_b'):
+        url = config.get(key) or ''
+        if not url:
+            continue
+        if not url.startswith("http://") and not url.startswith("https://"):
+            url = "http://" + url
+        try:
+            host = urlparse(url).hostname
+        except ValueError:
+            host = None
+        if host:
+            hosts.add(host.lower())
+    return hosts
+
+
+# Adaptive scheduling: grow the interval this much after a run with no changes,
+# shrink it this much after a run that changed something
+ADAPTIVE_GROWTH = 1.5
+ADAPTIVE_SHRINK = 0.5
+# Default bounds (multiples of interval_minutes) when a job doesn't configure them
+ADAPTIVE_DEFAULT_MAX_FACTOR = 8
+
+CHANGES_MARKER = "SYNCARR_CHANGES:"
+SUMMARY_MARKER = "SYNCARR_SUMMARY:"
+# Without markers, changes are counted from the sync's own output: SYNCARR_PROGRESS
+# phases named after a change (e.g. "Adding"), else per-item action log lines
+CHANGE_VERBS = ("add", "updat", "delet", "remov", "unmonitor", "monitor")
+ITEM_ACTION_RE = re.compile(r"\b(?:adding|updating|deleting|removing|unmonitoring|re-?monitoring)\s+(?!\d+\s+items?\b)\S", re.I)
+
+
+def job_interval(job):
+    """Interval currently in effect: the adapted interval for adaptive jobs, else interval_minutes"""
+    if job.get('adaptive') and job.get('effective_interval_minutes'):
+        lo, hi = adaptive_bounds(job)
+        return min(hi, max(lo, int(job['effective_interval_minutes'])))
+    return max(1, int(job.get('interval_minutes', 60) or 60))
+
+
+def adaptive_bounds(job):
+    base = max(1, int(job.get('interval_minutes', 60) or 60))
+    lo = int(job.get('min_interval_minutes') or base)
+    hi = int(job.get('max_interval_minutes') or base * ADAPTIVE_DEFAULT_MAX_FACTOR)
+    lo = max(1, lo)
+    return lo, max(lo, hi)
+
+
+def adapt_interval(job, changes):
+    """
+    Next interval for an adaptive job given how many items its last run changed:
+    lengthen after a quiet run, shorten after a busy one, clamped to the job's
+    min/max bounds. Returns the current interval unchanged if `changes` is unknown.
+    """
+    current = job_interval(job)
+    if changes is None:
+        return current
+    lo, hi = adaptive_bounds(job)
+    factor = ADAPTIVE_GROWTH if changes == 0 else ADAPTIVE_SHRINK
+    return int(min(hi, max(lo, round(current * factor))))
+
+
+def parse_changes(line):
+    """
+    Number of changed items reported by a sync output line, or None.
+
+    Understands `SYNCARR_CHANGES:<n>` and delta summaries such as
+    `SYNCARR_SUMMARY:added=3,updated=0,deleted=1` (all counts are summed).
+    """
+    try:
+        if line.startswith(CHANGES_MARKER):
+            return int(line[len(CHANGES_MARKER):].strip())
+        if line.startswith(SUMMARY_MARKER):
+            total = 0
+            for part in line[len(SUMMARY_MARKER):].split(","):
+                if "=" in part:
+                    total += int(part.split("=", 1)[1].strip())
+            return total
+    except ValueError:
+        pass
+    return None
+
+
+def is_change_phase(phase):
+    """True for progress phases that change items (Adding, Updating monitoring, ...)"""
+    return phase.strip().lower().startswith(CHANGE_VERBS)
+
+
+def changes_from_phases(phase_items):
+    """Items processed in change phases ({phase: items}), or None if the run had none"""
+    counts = [items for phase, items in phase_items.items() if is_change_phase(phase)]
+    return sum(counts) if counts else None
+
+
+def is_item_action(line):
+    """True for log lines reporting a change to one item, e.g. `Adding The Matrix (1999) to instance B`"""
+    return ITEM_ACTION_RE.search(line) is not None
+
+
+def compute_stagger_offsets(jobs):
+    """
+    Assign each staggered interval job a start offset (minutes) so jobs sharing
+    a host are spread evenly across their interval. A job that talks to several
+    hosts is spread within the group of its busiest host. Deterministic: jobs are
+    ranked by id, so offsets only move when the group membership changes.
+    """
+    staggered = [j for j in jobs if j.get('stagger') and not j.get('cron')]
+    groups = {}
+    for job in staggered:
+        for host in job_hosts(job) or {''}:
+            groups.setdefault(host, []).append(job)
+
+    offsets = {}
+    for job in staggered:
+        hosts = job_hosts(job) or {''}
+        members = max((groups[h] for h in hosts), key=len)
+        members = sorted(members, key=lambda j: j['id'])
+        index = next(i for i, j in enumerate(members) if j['id'] == job['id'])
+        offsets[job['id']] = (index * job_interval(job)) // len(members)
+    return offsets
+
+
+def parse_last_run(job):
+    """Returns the last run as a datetime, None for never-run jobs. Raises ValueError if malformed."""
+    last_run_str = job.get('last_run')
+    if last_run_str == "Never" or not last_run_str:
+        return None
+    return datetime.strptime(last_run_str, TIME_FORMAT)
+
+
+def next_run_time(job, now, offset=None):
+    """
+    When the job should next start. A result <= `now` means it is due.
+
+    - cron jobs run at the next matching minute after their last run
+      (never-run cron jobs wait for the first match)
+    - staggered interval jobs run in fixed slots `offset` minutes into each interval
+    - plain interval jobs run `interval_minutes` after their last run
+      (never-run jobs run immediately)
+    """
+    last_run = parse_last_run(job)
+
+    if job.get('cron'):
+        cron = get_cron(job['cron'])
+        if last_run is None:
+            minute = now.replace(second=0, microsecond=0)
+            return minute if cron.matches(minute) else cron.next_after(now)
+        return cron.next_after(last_run)
+
+    interval = job_interval(job)
+    if offset is not None:
+        # Never-run jobs take their most recent slot if the poll just missed it
+        ref = last_run or now - timedelta(minutes=2)
+        minutes = int((ref - SLOT_EPOCH).total_seconds() // 60)
+        slots_done = (minutes - offset) // interval
+        return SLOT_EPOCH + timedelta(minutes=(slots_done + 1) * interval + offset)
+
+    if last_run is None:
+        return now
+    return last_run + timedelta(minutes=interval)
+
+
+def estimated_duration_minutes(job):
+    """Expected run length from previous runs' phase timings (at least one minute)"""
+    seconds = sum((job.get('phase_durations') or {}).values())
+    return max(1, int(round(seconds / 60.0)))
+
+
+def preview_load(jobs, start, hours=24):
+    """
+    Project the schedule forward and count, for every minute, how many jobs
+    would be running against each host. Runs are assumed to take as long as
+    their previous runs did.
+    """
+    minutes = int(hours * 60)
+    start = start.replace(second=0, microsecond=0)
+    end = start + timedelta(minutes=minutes)
+    offsets = compute_stagger_offsets(jobs)
+
+    per_host = {}
+    total = [0] * minutes
+    runs = {}
+    next_runs = {}
+    for job in jobs:
+        try:
+            simulated = dict(job)
+            t = next_run_time(simulated, start, offsets.get(job['id']))
+        except ValueError:
+            continue
+        next_runs[job['id']] = max(t, start).strftime(TIME_FORMAT)
+        duration = estimated_duration_minutes(job)
+        hosts = job_hosts(job) or {''}
+        count = 0
+        while t < end:
+            t = max(t, start)
+            first = int((t - start).total_seconds() // 60)
+            for m in range(first, min(first + duration, minutes)):
+                total[m] += 1
+                for host in hosts:
+                    per_host.setdefault(host, [0] * minutes)[m] += 1
+            count += 1
+            finished = t + timedelta(minutes=duration)
+            simulated['last_run'] = finished.strftime(TIME_FORMAT)
+            t = next_run_time(simulated, finished, offsets.get(job['id']))
+        runs[job['id']] = count
+
+    return {
+        'start': start.strftime(TIME_FORMAT),
+        'minutes': minutes,
+        'total': total,
+        'hosts': per_host,
+        'peak': max(total) if total else 0,
+        'host_peaks': {h: max(counts) for h, counts in per_host.items()},
+        'runs': runs,
+        'next_runs': next_runs,
+        'offsets': offsets,
+    }
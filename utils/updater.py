@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import shutil
+import sys
+import threading
+
+# Incremental self-update from a source directory (e.g. a network share).
+# Changed files are copied from the source into a staging tree next to the
+# install, unchanged files are copied locally, hashes are verified, then each
+# top-level item is swapped in with a rename; on any failure the previous
+# items are moved back.
+UPDATE_ITEMS = [
+    "syncarr_source",
+    "static",
+    "routers",
+    "utils",
+    "scheduler.py",
+    "web_app.py",
+    "worker.py",
+]
+# Published by the source so the install can skip hashing files over the network
+MANIFEST_FILE = "update_manifest.json"
+STAGING_DIR = ".update_staging"
+BACKUP_DIR = ".update_backup"  # Previous version, kept until the next update
+IGNORED_NAMES = {"__pycache__", ".git", ".DS_Store", "Thumbs.db"}
+IGNORED_SUFFIXES = (".pyc", ".pyo")
+CHUNK_SIZE = 1024 * 1024
+
+_update_lock = threading.Lock()
+
+
+class UpdateError(Exception):
+    pass
+
+
+def _walk(root, items):
+    """{relative path: stat} of the files of `items` under `root`"""
+    files = {}
+    for item in items:
+        top = os.path.join(root, item)
+        if os.path.isfile(top):
+            files[item] = os.stat(top)
+            continue
+        for dirpath, dirnames, filenames in os.walk(top):
+            dirnames[:] = [d for d in dirnames if d not in IGNORED_NAMES]
+            for name in filenames:
+                if name in IGNORED_NAMES or name.endswith(IGNORED_SUFFIXES):
+                    continue
+                full = os.path.join(dirpath, name)
+                files[os.path.relpath(full, root).replace(os.sep, "/")] = os.stat(full)
+    return files
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def build_manifest(root, items=UPDATE_ITEMS):
+    """{relative path: {'sha256', 'size'}} for every file of `items` under `root`"""
+    return {rel: {"sha256": file_hash(os.path.join(root, rel)), "size": st.st_size}
+            for rel, st in sorted(_walk(root, items).items())}
+
+
+def write_manifest(root, items=UPDATE_ITEMS):
+    manifest = build_manifest(root, items)
+    with open(os.path.join(root, MANIFEST_FILE), "w") as f:
+        json.dump({"files": manifest}, f, indent=1)
+    return manifest
+
+
+def _load_source_manifest(source):
+    path = os.path.join(source, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r") as f:
+            return json.load(f)["files"]
+    except Exception as e:
+        raise UpdateError(f"Unreadable {MANIFEST_FILE} in update source: {e}")
+
+
+def _copy_hashed(src, dst):
+    """Copy a file (keeping its mtime) and return the sha256 of the bytes written"""
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    h = hashlib.sha256()
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        for chunk in iter(lambda: fin.read(CHUNK_SIZE), b""):
+            h.update(chunk)
+            fout.write(chunk)
+    shutil.copystat(src, dst)
+    return h.hexdigest()
+
+
+def plan_update(source, install, items=UPDATE_ITEMS):
+    """
+    Compare source and install. Uses the source's update_manifest.json when
+    present; otherwise a file with the same size and mtime (copies keep the
+    mtime) is taken as unchanged, like rsync does, and a file with the same
+    size but another mtime is hashed on both sides.
+    Returns (source files {rel: expected sha256 or None}, changed, removed).
+    """
+    manifest = _load_source_manifest(source)
+    if manifest is not None:
+        # An item the manifest doesn't list (e.g. written by an older version) would
+        # look fully removed and be swapped out with nothing in its place
+        covered = {rel.split("/", 1)[0] for rel in manifest}
+        uncovered = [item for item in items if item not in covered]
+        stale = [item for item in uncovered if _walk(source, [item])]
+        if stale:
+            raise UpdateError(f"{MANIFEST_FILE} in the update source doesn't cover {', '.join(stale)}; "
+                              "regenerate it with `python -m utils.updater`")
+        items = [item for item in items if item in covered]  # Empty in the source: leave the install's copy alone
+    installed = _walk(install, items)
+    changed = []
+    if manifest is not None:
+        source_files = {rel: entry["sha256"] for rel, entry in manifest.items() if rel.split("/", 1)[0] in items}
+        for rel, expected in source_files.items():
+            st = installed.get(rel)
+            if st is None or st.st_size != manifest[rel]["size"] or file_hash(os.path.join(install, rel)) != expected:
+                changed.append(rel)
+    else:
+        source_stats = _walk(source, items)
+        source_files = dict.fromkeys(source_stats)
+        for rel, st in source_stats.items():
+            local = installed.get(rel)
+            if local is not None and local.st_size == st.st_size:
+                # 2 s tolerance for FAT/SMB timestamp resolution
+                if abs(local.st_mtime - st.st_mtime) <= 2:
+                    continue
+                # Touched but maybe not changed: compare contents, and verify the staged copy against it
+                source_files[rel] = file_hash(os.path.join(source, rel))
+                if file_hash(os.path.join(install, rel)) == source_files[rel]:
+                    continue
+            changed.append(rel)
+    removed = sorted(set(installed) - set(source_files))
+    return source_files, sorted(changed), removed
+
+
+def _stage(source, install, staging, source_files, changed, items):
+    """
+    Build the new version of `items` in `staging`: changed files from the
+    source, the rest copied locally. Every staged file is read back and must
+    match the hash of what was copied (and the expected hash, when known).
+    """
+    if os.path.exists(staging):
+        shutil.rmtree(staging)
+    os.makedirs(staging)
+    changed = set(changed)
+    for rel, expected in source_files.items():
+        if rel.split("/", 1)[0] not in items:
+            continue
+        dst = os.path.join(staging, rel)
+        if rel in changed:
+            try:
+                digest = _copy_hashed(os.path.join(source, rel), dst)
+            except FileNotFoundError:
+                raise UpdateError(f"{rel} is listed in the update source's manifest but missing from the source")
+            if expected and digest != expected:
+                raise UpdateError(f"Hash mismatch for {rel}; the source changed after the update was planned")
+        else:
+            digest = _copy_hashed(os.path.join(install, rel), dst)
+            if expected and digest != expected:
+                raise UpdateError(f"Hash mismatch for {rel}; the install changed after the update was planned")
+        if file_hash(dst) != digest:
+            raise UpdateError(f"Staged copy of {rel} doesn't match what was written; check the install disk")
+
+
+def _swap(install, staging, backup, items):
+    """Move each staged item into place, keeping the old one in `backup`; undo everything on failure"""
+    if os.path.exists(backup):
+        shutil.rmtree(backup)
+    os.makedirs(backup)
+    swapped = []
+    try:
+        for item in items:
+            target = os.path.join(install, item)
+            staged = os.path.join(staging, item)
+            had_old = os.path.exists(target)
+            if had_old:
+                os.replace(target, os.path.join(backup, item))
+            swapped.append((item, had_old))
+            if os.path.exists(staged):
+                os.replace(staged, target)
+    except Exception:
+        for item, had_old in reversed(swapped):
+            target = os.path.join(install, item)
+            try:
+                if os.path.isdir(target):
+                    shutil.rmtree(target)
+                elif os.path.exists(target):
+                    os.remove(target)
+                if had_old:
+                    os.replace(os.path.join(backup, item), target)
+            except Exception as e:
+                print(f"Update rollback failed for {item}: {e}")
+        raise
+
+
+def incremental_update(source, install, items=UPDATE_ITEMS):
+    """
+    Update `install` from `source`, transferring only changed files. Returns
+    {'changed', 'removed', 'unchanged'}; raises UpdateError (install untouched)
+    or re-raises a swap failure after rolling back.
+    """
+    if not _update_lock.acquire(blocking=False):
+        raise UpdateError("An update is already in progress")
+    try:
+        items = [i for i in items if os.path.exists(os.path.join(source, i))]
+        if not items:
+            raise UpdateError(f"Nothing to update in {source}")
+        source_files, changed, removed = plan_update(source, install, items)
+        result = {"changed": changed, "removed": removed, "unchanged": len(source_files) - len(changed)}
+        if not changed and not removed:
+            return result
+
+        # Only items that differ are staged and swapped; untouched directories stay in place
+        touched = sorted({rel.split("/", 1)[0] for rel in changed + removed})
+        emptied = [item for item in touched if not any(rel.split("/", 1)[0] == item for rel in source_files)]
+        if emptied:
+            raise UpdateError(f"Update would remove every file of {', '.join(emptied)}; refusing")
+        staging = os.path.join(install, STAGING_DIR)
+        try:
+            _stage(source, install, staging, source_files, changed, touched)
+            _swap(install, staging, os.path.join(install, BACKUP_DIR), touched)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return result
+    finally:
+        _update_lock.release()
+
+
+if __name__ == "__main__":
+    # Run on the update source after publishing new files: python -m utils.updater [directory]
+    root = sys.argv[1] if len(sys.argv) > 1 else os.getcwd()
+    files = write_manifest(root)
+    print(f"Wrote {MANIFEST_FILE} with {len(files)} files")
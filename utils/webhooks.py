@@ -0,0 +1,156 @@
+import hmac
+import os
+import threading
+import time
+
+# Wait this long after the last event before syncing, so bursts (e.g. a season import) become one run
+DEBOUNCE_SECONDS = 10
+# ...but never hold events longer than this
+MAX_WAIT_SECONDS = 60
+# Batches bigger than this fall back to a full-library run
+MAX_TARGETED_ITEMS = 25
+
+# A sync script declares targeted-run support by reading this variable; scripts
+# that don't would silently do a full sync, so they get a normal full run instead
+TARGET_CAPABILITY = "SYNCARR_TARGET_IDS"
+
+# Events that don't change library content
+IGNORED_EVENTS = {"Test", "Grab", "Health", "HealthRestored", "ApplicationUpdate", "ManualInteractionRequired"}
+
+# Events that remove the item itself from the library. File deletes (MovieFileDelete,
+# EpisodeFileDelete, e.g. on every quality upgrade) only change the item.
+LIBRARY_DELETE_EVENTS = {"MovieDelete", "SeriesDelete", "ArtistDelete"}
+
+# Payload key holding the affected item, and its external id fields, per *arr type
+ITEM_KEYS = {
+    "radarr": ("movie", ("tmdbId", "imdbId")),
+    "sonarr": ("series", ("tvdbId", "imdbId")),
+    "lidarr": ("artist", ("mbId", "foreignArtistId")),
+}
+
+
+_capability_cache = {}
+
+
+def supports_targeted_runs(script_dir):
+    """True if the sync script's sources use TARGET_CAPABILITY (re-checked when a file changes)"""
+    try:
+        files = sorted(os.path.join(script_dir, name) for name in os.listdir(script_dir) if name.endswith(".py"))
+        key = tuple((path, os.stat(path).st_mtime_ns) for path in files)
+    except OSError:
+        return False
+    cached = _capability_cache.get(script_dir)
+    if cached and cached[0] == key:
+        return cached[1]
+    supported = False
+    for path in files:
+        try:
+            with open(path, "r", encoding="utf-8", errors="replace") as f:
+                if TARGET_CAPABILITY in f.read():
+                    supported = True
+                    break
+        except OSError:
+            pass
+    _capability_cache[script_dir] = (key, supported)
+    return supported
+
+
+def token_matches(expected, provided):
+    """Constant-time token check; compares bytes so non-ASCII input is a mismatch, not an error"""
+    if not expected or not provided:
+        return False
+    return hmac.compare_digest(expected.encode("utf-8"), provided.encode("utf-8"))
+
+
+def parse_arr_webhook(job_type, payload):
+    """
+    Extract the event type and affected library items from a Radarr/Sonarr/Lidarr
+    webhook payload. Returns (event_type, items) where each item is
+    {'id', 'external_id', 'title', 'deleted'}. Ignored events return no items.
+    """
+    event_type = payload.get("eventType", "")
+    if event_type in IGNORED_EVENTS:
+        return event_type, []
+
+    key, external_fields = ITEM_KEYS.get(job_type, ITEM_KEYS["radarr"])
+    entries = payload.get(key)
+    if entries is None:
+        entries = payload.get(key + "s", [])  # Some events carry a list
+    if isinstance(entries, dict):
+        entries = [entries]
+
+    deleted = event_type in LIBRARY_DELETE_EVENTS
+    items = []
+    for entry in entries or []:
+        if not isinstance(entry, dict) or entry.get("id") is None:
+            continue
+        external_id = next((entry[f] for f in external_fields if entry.get(f)), None)
+        items.append({
+            "id": entry["id"],
+            "external_id": external_id,
+            "title": entry.get("title") or entry.get("artistName") or entry.get("name"),
+            "deleted": deleted,
+        })
+    return event_type, items
+
+
+class WebhookBatcher:
+    """
+    Debounces webhook events per (job, source instance) and hands each batch to
+    `dispatch(job_id, source, items)` once no new events arrived for
+    DEBOUNCE_SECONDS (or MAX_WAIT_SECONDS after the first event). `dispatch`
+    returns False to have the batch retried later (e.g. the job is running).
+    """
+
+    def __init__(self, dispatch):
+        self.dispatch = dispatch
+        self._lock = threading.Lock()
+        self._pending = {}  # {(job_id, source): {'items': {id: item}, 'first': t, 'timer': Timer}}
+
+    def add(self, job_id, source, items):
+        key = (job_id, source)
+        with self._lock:
+            batch = self._pending.get(key)
+            if batch is None:
+                batch = self._pending[key] = {'items': {}, 'first': time.monotonic(), 'timer': None}
+            for item in items:
+                batch['items'][item['id']] = item  # Later events for the same item win
+            self._arm(key, batch)
+            return len(batch['items'])
+
+    def _arm(self, key, batch):
+        if batch['timer']:
+            batch['timer'].cancel()
+        remaining = MAX_WAIT_SECONDS - (time.monotonic() - batch['first'])
+        delay = max(0.0, min(DEBOUNCE_SECONDS, remaining))
+        batch['timer'] = threading.Timer(delay, self._flush, args=(key,))
+        batch['timer'].daemon = True
+        batch['timer'].start()
+
+    def _flush(self, key):
+        with self._lock:
+            batch = self._pending.pop(key, None)
+        if not batch:
+            return
+        job_id, source = key
+        try:
+            accepted = self.dispatch(job_id, source, list(batch['items'].values()))
+        except Exception as e:
+            print(f"Webhook dispatch error for job {job_id}: {e}")
+            accepted = True
+        if accepted is False:
+            # Put the batch back (merging anything that arrived meanwhile) and try again later
+            with self._lock:
+                current = self._pending.get(key)
+                if current:
+                    batch['items'].update(current['items'])
+                    if current['timer']:
+                        current['timer'].cancel()
+                batch['first'] = time.monotonic()
+                batch['timer'] = None
+                self._pending[key] = batch
+                self._arm(key, batch)
+
+    def pending(self):
+        with self._lock:
+            return {f"{job_id}:{source}": len(b['items']) for (job_id, source), b in self._pending.items()}
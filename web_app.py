@@ -1,25 +1,40 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import RedirectResponse
+from fastapi import FastAPI, Request
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, RedirectResponse
 import uvicorn
 import os
 import json
 import threading
 
-from routers import auth, jobs, system
+from routers import auth, jobs, system, webhooks
 import scheduler
+from utils import ipc, profiling
+from utils.assets import PrecompressedStaticFiles
+from utils.ipc import SchedulerUnavailable, scheduler_mode
 
 app = FastAPI(title="Syncarr Web GUI")
 
-# Mount static files
+# Compress large API responses (job lists, logs); precompressed static assets pass through untouched
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Per-route latency histograms and slow-request logging, only when `profiling` is on
+if profiling.enabled():
+    app.add_middleware(profiling.ProfilingMiddleware)
+
+# Mount static files (JS/CSS fingerprinted and precompressed at startup)
 if not os.path.exists("static"):
     os.makedirs("static")
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", PrecompressedStaticFiles(directory="static"), name="static")
 
 # Include routers
 app.include_router(auth.router)
 app.include_router(jobs.router) # Jobs replace Config
 app.include_router(system.router)
+app.include_router(webhooks.router)
+
+@app.exception_handler(SchedulerUnavailable)
+async def scheduler_unavailable_handler(request: Request, exc: SchedulerUnavailable):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
 
 @app.get("/")
 async def root():
@@ -35,10 +50,34 @@ def get_port():
                 pass
     return 8000
 
+def get_workers():
+    """Number of API worker processes (`workers` in gui_config.json)"""
+    if os.path.exists("gui_config.json"):
+        with open("gui_config.json", 'r') as f:
+            try:
+                config = json.load(f)
+                return max(1, int(config.get("workers", 1)))
+            except:
+                pass
+    return 1
+
 if __name__ == "__main__":
-    # Start Scheduler
-    scheduler.start_scheduler()
+    workers = get_workers()
+
+    # Start Scheduler, unless it runs as its own process (worker.py)
+    if scheduler_mode() == "external":
+        print("Scheduler mode is 'external'; start it with: python worker.py")
+    else:
+        scheduler.start_scheduler()
+        if workers > 1:
+            # The scheduler stays in this (supervisor) process; API workers reach it over IPC
+            threading.Thread(target=ipc.serve_forever, args=(scheduler,), daemon=True).start()
+            os.environ[ipc.REMOTE_ENV] = "1"
     
     port = get_port()
     print(f"Starting server on port {port}...")
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    if workers > 1:
+        print(f"Using {workers} worker processes")
+        uvicorn.run("web_app:app", host="0.0.0.0", port=port, workers=workers)
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=port)
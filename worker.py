@@ -0,0 +1,15 @@
+import os
+
+import scheduler
+from utils import ipc
+
+# Runs the scheduler and job executor in their own process, so heavy job output
+# doesn't compete with the web API and the web UI can be restarted without
+# killing running syncs. Set "scheduler_mode": "external" in gui_config.json so
+# web_app.py doesn't start a second scheduler and talks to this one instead.
+
+if __name__ == "__main__":
+    # Paths like syncarr_source/ and logs/ are relative to the install directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    scheduler.start_scheduler()
+    ipc.serve_forever(scheduler)